@@ -0,0 +1,102 @@
+"""Script untuk mengecek waktu import startup dashboard dengan `python -X importtime`
+
+Gagal (exit code 1) jika total waktu import melebihi IMPORT_TIME_BUDGET_MS atau
+jika modul berat (TensorFlow, h5py, plotly, ...) ikut ter-import saat startup.
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+from constants import IMPORT_TIME_BUDGET_MS
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DASHBOARD_PATH = os.path.join(PROJECT_DIR, 'dashboard.py')
+
+# Tabel halaman di dashboard.py; modul halaman pertama (default) ikut di-import saat startup
+PAGE_TABLES = ['PAGES', 'STREAMING_PAGES']
+
+# Modul berat yang hanya boleh di-import oleh halaman yang membutuhkannya
+LAZY_MODULES = ['tensorflow', 'keras', 'h5py', 'sklearn', 'plotly.express']
+
+
+def startup_modules(path=DASHBOARD_PATH):
+    """
+    Modul yang di-import dashboard.py sebelum halaman pertama dirender, dibaca dari source:
+    import level teratas ditambah modul halaman pertama di setiap tabel PAGE_TABLES.
+    """
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+        elif isinstance(node, ast.Assign) and any(
+            isinstance(target, ast.Name) and target.id in PAGE_TABLES for target in node.targets
+        ):
+            pages = ast.literal_eval(node.value)
+            if pages:
+                modules.append(next(iter(pages.values()))[0])
+    return list(dict.fromkeys(modules))
+
+
+def measure_import_time(modules):
+    """
+    Jalankan import di proses baru dengan -X importtime.
+    Return (total_ms, {modul_top_level: cumulative_ms}, set semua modul ter-import).
+    """
+    code = '; '.join(f'import {m}' for m in modules)
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, cwd=PROJECT_DIR
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+    
+    top_level = {}
+    imported = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        module = name.strip()
+        imported.add(module)
+        # Nama tanpa indentasi tambahan = import level teratas
+        if not name[1:].startswith(' '):
+            top_level[module] = int(cumulative_us) / 1000
+    return sum(top_level.values()), top_level, imported
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cek budget waktu import startup dashboard")
+    parser.add_argument('--budget', type=float, default=IMPORT_TIME_BUDGET_MS, help="Budget dalam ms")
+    parser.add_argument('--repeat', type=int, default=3, help="Jumlah pengukuran (diambil yang tercepat)")
+    args = parser.parse_args(argv)
+    
+    modules = startup_modules()
+    runs = [measure_import_time(modules) for _ in range(args.repeat)]
+    total_ms, top_level, imported = min(runs, key=lambda run: run[0])
+    
+    print(f"Total waktu import startup: {total_ms:.0f} ms (budget {args.budget:.0f} ms)")
+    print("Modul paling lambat:")
+    for module, ms in sorted(top_level.items(), key=lambda item: -item[1])[:10]:
+        print(f"  {ms:8.1f} ms  {module}")
+    
+    failed = False
+    eager = sorted(m for m in LAZY_MODULES if m in imported)
+    if eager:
+        print(f"GAGAL: modul berat ter-import saat startup: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget:
+        print(f"GAGAL: waktu import melebihi budget ({total_ms:.0f} > {args.budget:.0f} ms)")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,11 +7,98 @@ COLORS = {
     'asi_no': '#e74c3c'
 }
 
+# Label untuk kode Stunting int8 (indeks = kode)
+STUNTING_LABELS = ['Tidak Stunting', 'Stunting']
+
+# Kelompok umur (bulan) untuk Analisis Detail: interval (a, b] seperti pd.cut
+AGE_BINS = [0, 12, 24, 36, 48, 60, 100]
+AGE_LABELS = ['0-12 bulan', '13-24 bulan', '25-36 bulan', '37-48 bulan', '49-60 bulan', '>60 bulan']
+
 DATASETS = [
     'dataset_stunting_balanced.csv',
     'dataset_ml_train_processed.csv',
     'dataset_dl_test_processed.csv'
 ]
 
+# Kolom yang dibaca load_data per dataset beserta dtype-nya. Kolom lain hanya
+# dibaca saat diminta Data Explorer; dataset tanpa entri dibaca utuh.
+RAW_DATASET_COLUMNS = {
+    'Sex': 'category',
+    'Age': 'float32',
+    'Birth_Weight': 'float32',
+    'Birth_Length': 'float32',
+    'Body_Weight': 'float32',
+    'Body_Length': 'float32',
+    'ASI_Eksklusif': 'category',
+    'Stunting': 'category',
+}
+
+PROCESSED_DATASET_COLUMNS = {
+    'Sex_Encoded': 'float32',
+    'ASI_Eksklusif_Encoded': 'float32',
+    'Age': 'float32',
+    'Birth_Weight': 'float32',
+    'Birth_Length': 'float32',
+    'Body_Weight': 'float32',
+    'Body_Length': 'float32',
+    'Stunting': 'category',
+}
+
+DATASET_COLUMNS = {
+    'dataset_stunting_balanced.csv': RAW_DATASET_COLUMNS,
+    'dataset_ml_train_processed.csv': PROCESSED_DATASET_COLUMNS,
+    'dataset_dl_test_processed.csv': PROCESSED_DATASET_COLUMNS,
+}
+
 MODEL_PATH = 'best_stunting_model.h5'
 
+
+# Scoring batch: jumlah baris CSV per chunk dan ukuran batch untuk model
+SCORING_CHUNK_SIZE = 10000
+PREDICT_BATCH_SIZE = 1024
+
+# Batas waktu import modul startup dashboard (dicek oleh check_import_time.py)
+IMPORT_TIME_BUDGET_MS = 3000
+
+# Jendela (ms) untuk menggabungkan request prediksi dari banyak sesi menjadi satu batch
+INFERENCE_BATCH_WINDOW_MS = 5
+
+# Cache hasil prediksi: jumlah entri maksimum, masa berlaku (detik), dan step input widget
+PREDICTION_CACHE_SIZE = 1024
+PREDICTION_CACHE_TTL = 3600
+PREDICTION_INPUT_STEPS = {
+    'Age': 1,
+    'Birth_Weight': 0.1,
+    'Birth_Length': 0.1,
+    'Body_Weight': 0.1,
+    'Body_Length': 0.1,
+}
+
+# Cache hasil filter (baris terpilih + agregat halaman) per kombinasi filter: jumlah entri
+# dan total memori (MB) maksimum sebelum entri yang paling lama tidak dipakai dibuang
+FILTER_CACHE_SIZE = 64
+FILTER_CACHE_MAX_MB = 256
+
+# Jumlah thread maksimum untuk membaca file dataset secara paralel
+INGEST_MAX_WORKERS = 8
+
+# Mode streaming: jika total ukuran file sumber melebihi batas ini (MB), Overview dan
+# Analisis Detail dihitung dari agregat per chunk tanpa memuat seluruh baris (0 = selalu)
+STREAMING_THRESHOLD_MB = 1024
+STREAM_CHUNK_SIZE = 100000
+
+# Sketsa kuantil per sel agregat: parameter k KLL (galat rank kira-kira 1-2% untuk k=200)
+# dan jumlah outlier maksimum yang digambar per box plot
+SKETCH_K = 200
+BOX_MAX_OUTLIERS = 100
+
+# Histogram Analisis Visual: jumlah bin per kolom (tepi bin tetap, dari dataset penuh)
+HISTOGRAM_BINS = 30
+
+# Folder untuk batch CSV baru; setiap file ditambahkan sebagai partisi baru
+INGEST_DIR = 'data_masuk'
+
+# Store partisi kolumnar dataset gabungan; naikkan versi jika proses ingest berubah
+DATA_CACHE_DIR = '.cache'
+DATA_STORE_DIR = '.cache/store'
+DATA_CACHE_VERSION = 6
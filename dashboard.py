@@ -1,12 +1,27 @@
 """Dashboard Analisis Stunting - File Utama"""
+import importlib
 import streamlit as st
-from utils.data_loader import load_data
-from utils.filters import setup_sidebar_filters
-from modules.overview import render_overview
-from modules.visual_analysis import render_visual_analysis
-from modules.detail_analysis import render_detail_analysis
-from modules.data_explorer import render_data_explorer
-from modules.prediction import render_prediction
+from utils.aggregates import load_aggregates, load_cube, use_streaming_mode
+from utils.data_loader import dataset_version, load_data
+from utils.filter_index import load_filter_index
+from utils.filters import setup_sidebar_filters, setup_sidebar_filters_aggregates
+from utils.group_stats import load_group_codes
+
+# Modul halaman di-import saat dibuka saja (halaman Prediksi memuat model, plotly, dll.)
+PAGES = {
+    "Overview": ("modules.overview", "render_overview"),
+    "Analisis Visual": ("modules.visual_analysis", "render_visual_analysis"),
+    "Analisis Detail": ("modules.detail_analysis", "render_detail_analysis"),
+    "Data Explorer": ("modules.data_explorer", "render_data_explorer"),
+    "Prediksi": ("modules.prediction", "render_prediction"),
+}
+
+# Mode streaming: halaman yang bisa dihitung dari agregat tanpa memuat seluruh baris
+STREAMING_PAGES = {
+    "Overview": ("modules.overview", "render_overview_aggregates"),
+    "Analisis Detail": ("modules.detail_analysis", "render_detail_analysis_aggregates"),
+    "Prediksi": ("modules.prediction", "render_prediction"),
+}
 
 # Konfigurasi halaman
 st.set_page_config(
@@ -15,20 +30,27 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Load data (gabungkan semua dataset)
-df = load_data()
-
-# Setup sidebar dan filter
-page, filtered_df = setup_sidebar_filters(df)
+# Load data (gabungkan semua dataset); versi berubah saat ada file sumber baru/berubah
+version = dataset_version()
+if use_streaming_mode():
+    # Dataset terlalu besar untuk dimuat utuh: sidebar dan halaman memakai agregat
+    data = load_aggregates(version)
+    page, filtered_data = setup_sidebar_filters_aggregates(data)
+    pages = STREAMING_PAGES
+else:
+    df = load_data(version)
+    page, filtered_data = setup_sidebar_filters(
+        df, load_filter_index(df, version), load_cube(df, version), version, load_group_codes(df, version)
+    )
+    pages = PAGES
 
 # Routing halaman
-if page == "Overview":
-    render_overview(filtered_df)
-elif page == "Analisis Visual":
-    render_visual_analysis(filtered_df)
-elif page == "Analisis Detail":
-    render_detail_analysis(filtered_df)
-elif page == "Data Explorer":
-    render_data_explorer(filtered_df)
-elif page == "Prediksi":
-    render_prediction()
+if page in pages:
+    module_name, render_name = pages[page]
+    render_page = getattr(importlib.import_module(module_name), render_name)
+    if page == "Prediksi":
+        render_page()
+    else:
+        render_page(filtered_data)
+else:
+    st.info(f"Halaman {page} membutuhkan seluruh baris data dan tidak tersedia di mode streaming.")
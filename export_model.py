@@ -0,0 +1,35 @@
+"""Script untuk mengekspor model Keras H5 ke artefak NumPy (.npz)"""
+import sys
+import numpy as np
+from constants import MODEL_PATH
+from utils.numpy_model import UnsupportedModelError, export_numpy_model, numpy_model_path
+
+model_path = sys.argv[1] if len(sys.argv) > 1 else MODEL_PATH
+output_path = numpy_model_path(model_path)
+
+print(f"Exporting {model_path}...")
+try:
+    model = export_numpy_model(model_path, output_path)
+except UnsupportedModelError as e:
+    print(f"Model tidak didukung mesin NumPy: {e}")
+    print("Dashboard akan tetap memakai Keras untuk model ini.")
+    sys.exit(1)
+
+print(f"Layers: {model.layers}")
+print(f"Input shape: {model.input_shape}, output shape: {model.output_shape}")
+print(f"Jumlah parameter: {model.count_params():,}")
+print(f"Model saved to {output_path}")
+
+# Cek forward pass dengan data acak
+sample = np.random.default_rng(0).normal(size=(3, model.input_shape[1])).astype(np.float32)
+print(f"Sample prediction: {model.predict(sample)[:, 0]}")
+
+# Bandingkan dengan Keras jika tersedia
+try:
+    from tensorflow import keras
+except ImportError:
+    keras = None
+if keras is not None:
+    keras_model = keras.models.load_model(model_path, compile=False)
+    diff = np.abs(keras_model.predict(sample, verbose=0) - model.predict(sample)).max()
+    print(f"Selisih maksimum vs Keras: {diff:.2e}")
@@ -1,5 +1,7 @@
 """Halaman Data Explorer"""
 import streamlit as st
+import pandas as pd
+from utils.data_loader import load_all_columns, memory_report
 
 
 def render_data_explorer(filtered_df):
@@ -8,9 +10,17 @@ def render_data_explorer(filtered_df):
     st.markdown("---")
     
     st.subheader("Tabel Data")
+    # Baris terpilih dimaterialisasi sekali untuk tabel, unduhan dan informasi dataset;
+    # tabel dan CSV disimpan di DataView sehingga kunjungan berikutnya tidak menghitung ulang
+    view = filtered_df
+    filtered_df = view.frame()
+    # Kolom yang tidak dipakai halaman lain hanya dibaca jika diminta
+    all_columns = st.checkbox("Tampilkan semua kolom dari file sumber", value=False)
+    if all_columns:
+        filtered_df = view.cached('all_columns', load_all_columns, filtered_df)
     st.dataframe(filtered_df, use_container_width=True, height=400)
     
-    csv = filtered_df.to_csv(index=False).encode('utf-8')
+    csv = view.cached(('csv', all_columns), lambda: filtered_df.to_csv(index=False).encode('utf-8'))
     st.download_button(
         label="Download Data sebagai CSV",
         data=csv,
@@ -33,4 +43,26 @@ def render_data_explorer(filtered_df):
     st.write("**Shape Dataset:**", filtered_df.shape)
     st.write("**Missing Values:**")
     st.write(filtered_df.isnull().sum())
-
+    
+    st.markdown("---")
+    st.subheader("Penggunaan Memori")
+    per_column, per_source = view.cached(('memory_report', all_columns), memory_report, filtered_df)
+    st.metric("Total Memori", f"{per_column['Memori (KB)'].sum() / 1024:,.2f} MB")
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.write("**Per Kolom:**")
+        st.dataframe(per_column, use_container_width=True)
+    
+    with col2:
+        if per_source is not None:
+            st.write("**Per Sumber Dataset:**")
+            st.dataframe(per_source, use_container_width=True, hide_index=True)
+    
+    ingest_report = filtered_df.attrs.get('ingest_report')
+    if ingest_report:
+        st.markdown("---")
+        st.subheader("Laporan Ingest Dataset")
+        st.caption("Waktu baca dan jumlah baris per file saat cache dataset dibangun (terlama di atas)")
+        report_df = pd.DataFrame(ingest_report).sort_values('Waktu (s)', ascending=False)
+        st.dataframe(report_df, use_container_width=True, hide_index=True)
@@ -1,10 +1,74 @@
 """Halaman Analisis Detail"""
 import streamlit as st
+import numpy as np
 import pandas as pd
-import plotly.express as px
 from utils.visualizations import create_bar_chart
-from utils.data_loader import count_stunting
-from constants import COLORS
+from constants import AGE_BINS, AGE_LABELS, COLORS
+from utils.aggregates import age_ceil, group_stats, measures_in, overall_stats
+from utils.data_loader import stunting_label
+from utils.group_stats import AGE_GROUP_COLUMN, group_sizes, grouped_stats, stunting_rate
+
+NUMERIC_COLUMNS = ['Age', 'Body_Weight', 'Body_Length', 'Birth_Weight', 'Birth_Length']
+
+
+def render_asi_percentage(asi_stunt_pct):
+    """Tabel dan bar chart persentase stunting per kelompok ASI Eksklusif"""
+    st.subheader("Persentase Stunting berdasarkan ASI Eksklusif")
+    st.dataframe(asi_stunt_pct, use_container_width=True)
+    
+    import plotly.express as px
+    fig = px.bar(
+        asi_stunt_pct.reset_index(),
+        x='ASI_Eksklusif',
+        y='Persentase',
+        color='ASI_Eksklusif',
+        color_discrete_sequence=[COLORS['asi_yes'], COLORS['asi_no']]
+    )
+    fig.update_layout(height=400, showlegend=False)
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def render_age_distribution(age_grouped):
+    fig = create_bar_chart(
+        age_grouped,
+        'Kelompok_Umur',
+        'Jumlah',
+        'Stunting_Label',
+        "Distribusi berdasarkan Kelompok Umur"
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def aggregate_asi_percentage(agg):
+    """Seperti stunting_rate(view, ['ASI_Eksklusif']), dari jumlah baris per sel agregat/cube"""
+    cells = agg.dropna(subset=['ASI_Eksklusif'])
+    cells = cells[cells['Stunting'] >= 0]
+    asi_stunt_pct = pd.DataFrame({
+        'sum': (cells['n'] * cells['Stunting']).groupby(cells['ASI_Eksklusif']).sum(),
+        'count': cells.groupby('ASI_Eksklusif')['n'].sum()
+    })
+    asi_stunt_pct['Persentase'] = (asi_stunt_pct['sum'] / asi_stunt_pct['count'] * 100).round(2)
+    return asi_stunt_pct
+
+
+def age_group_tables(filtered_df):
+    """
+    Rata-rata per (kelompok umur, Stunting) dan jumlah per (kelompok umur, label); None jika
+    kolom tidak ada. Kode kelompok umur sudah dihitung saat load (GroupCodes), tanpa pd.cut.
+    """
+    age_analysis = age_grouped = None
+    if 'Stunting' not in filtered_df.columns:
+        return age_analysis, age_grouped
+    numeric_cols = [c for c in ['Body_Weight', 'Body_Length'] if c in filtered_df.columns]
+    if numeric_cols:
+        age_analysis = grouped_stats(filtered_df, [AGE_GROUP_COLUMN, 'Stunting'], numeric_cols, stats=('mean',)).round(2)
+    counts = group_sizes(filtered_df, [AGE_GROUP_COLUMN, 'Stunting']).reset_index(name='Jumlah')
+    age_grouped = pd.DataFrame({
+        AGE_GROUP_COLUMN: counts[AGE_GROUP_COLUMN],
+        'Stunting_Label': stunting_label(counts['Stunting'].astype(np.int8)),
+        'Jumlah': counts['Jumlah'],
+    })
+    return age_analysis, age_grouped
 
 
 def render_detail_analysis(filtered_df):
@@ -31,70 +95,108 @@ def render_detail_analysis(filtered_df):
         st.subheader("Analisis berdasarkan Jenis Kelamin")
         numeric_cols = [c for c in ['Age', 'Body_Weight', 'Body_Length', 'Birth_Weight', 'Birth_Length'] if c in filtered_df.columns]
         if numeric_cols:
-            sex_analysis = filtered_df.groupby(['Sex', 'Stunting'])[numeric_cols].agg('mean').round(2)
+            sex_analysis = filtered_df.cached(
+                'sex_analysis',
+                lambda: grouped_stats(filtered_df, ['Sex', 'Stunting'], numeric_cols, stats=('mean',)).round(2)
+            )
             st.dataframe(sex_analysis, use_container_width=True)
     
     elif analysis_type == "Analisis berdasarkan ASI Eksklusif":
         st.subheader("Analisis berdasarkan ASI Eksklusif")
         numeric_cols = [c for c in ['Age', 'Body_Weight', 'Body_Length', 'Birth_Weight', 'Birth_Length'] if c in filtered_df.columns]
         if numeric_cols:
-            asi_analysis = filtered_df.groupby(['ASI_Eksklusif', 'Stunting'])[numeric_cols].agg('mean').round(2)
+            asi_analysis = filtered_df.cached(
+                'asi_analysis',
+                lambda: grouped_stats(filtered_df, ['ASI_Eksklusif', 'Stunting'], numeric_cols, stats=('mean',)).round(2)
+            )
             st.dataframe(asi_analysis, use_container_width=True)
         
         if 'Stunting' in filtered_df.columns:
-            # Hitung jumlah stunting per kelompok ASI Eksklusif
-            asi_stunt_pct = filtered_df.groupby('ASI_Eksklusif')['Stunting'].agg([
-                lambda x: count_stunting(x), 'count'
-            ])
-            asi_stunt_pct.columns = ['sum', 'count']
-            asi_stunt_pct['Persentase'] = (asi_stunt_pct['sum'] / asi_stunt_pct['count'] * 100).round(2)
-            st.subheader("Persentase Stunting berdasarkan ASI Eksklusif")
-            st.dataframe(asi_stunt_pct, use_container_width=True)
-            
-            fig = px.bar(
-                asi_stunt_pct.reset_index(),
-                x='ASI_Eksklusif',
-                y='Persentase',
-                color='ASI_Eksklusif',
-                color_discrete_sequence=[COLORS['asi_yes'], COLORS['asi_no']]
-            )
-            fig.update_layout(height=400, showlegend=False)
-            st.plotly_chart(fig, use_container_width=True)
+            # Hitung jumlah stunting per kelompok ASI Eksklusif (dari cube jika tersedia)
+            if filtered_df.cube is not None:
+                asi_stunt_pct = filtered_df.cached('asi_percentage', aggregate_asi_percentage, filtered_df.cube)
+            else:
+                asi_stunt_pct = filtered_df.cached('asi_percentage', stunting_rate, filtered_df, ['ASI_Eksklusif'])
+            render_asi_percentage(asi_stunt_pct)
     
     elif analysis_type == "Analisis berdasarkan Umur":
         st.subheader("Analisis berdasarkan Kelompok Umur")
         if 'Age' in filtered_df.columns:
-            filtered_df['Kelompok_Umur'] = pd.cut(
-                filtered_df['Age'],
-                bins=[0, 12, 24, 36, 48, 60, 100],
-                labels=['0-12 bulan', '13-24 bulan', '25-36 bulan', '37-48 bulan', '49-60 bulan', '>60 bulan']
-            )
-            
-            numeric_cols = [c for c in ['Body_Weight', 'Body_Length'] if c in filtered_df.columns]
-            if numeric_cols:
-                age_analysis = filtered_df.groupby(['Kelompok_Umur', 'Stunting'])[numeric_cols].agg('mean').round(2)
+            age_analysis, age_grouped = filtered_df.cached('age_group_tables', age_group_tables, filtered_df)
+            if age_analysis is not None:
                 st.dataframe(age_analysis, use_container_width=True)
             
-            if 'Stunting' in filtered_df.columns:
-                age_grouped = filtered_df.groupby(['Kelompok_Umur', 'Stunting']).size().reset_index(name='Jumlah')
-                fig = create_bar_chart(
-                    age_grouped,
-                    'Kelompok_Umur',
-                    'Jumlah',
-                    'Stunting',
-                    "Distribusi berdasarkan Kelompok Umur"
-                )
-                st.plotly_chart(fig, use_container_width=True)
+            if age_grouped is not None:
+                render_age_distribution(age_grouped)
     
     elif analysis_type == "Statistik Deskriptif":
         st.subheader("Statistik Deskriptif")
         numeric_cols = [c for c in ['Age', 'Birth_Weight', 'Birth_Length', 'Body_Weight', 'Body_Length'] if c in filtered_df.columns]
         if numeric_cols:
-            desc_stats = filtered_df[numeric_cols].describe()
+            desc_stats = filtered_df.cached('desc_stats', lambda: filtered_df[numeric_cols].describe())
             st.dataframe(desc_stats, use_container_width=True)
             
             if 'Stunting' in filtered_df.columns:
                 st.subheader("Perbandingan Statistik: Stunting vs Tidak Stunting")
-                comparison = filtered_df.groupby('Stunting')[numeric_cols].agg(['mean', 'std', 'min', 'max']).round(2)
+                comparison = filtered_df.cached(
+                    'stunting_comparison',
+                    lambda: grouped_stats(filtered_df, ['Stunting'], numeric_cols).round(2)
+                )
                 st.dataframe(comparison, use_container_width=True)
 
+
+def render_detail_analysis_aggregates(filtered_agg):
+    """Render halaman analisis detail dari agregat sel (mode streaming)"""
+    st.title("Analisis Detail Data Stunting")
+    st.markdown("---")
+    
+    measures = measures_in(filtered_agg)
+    analysis_options = ["Analisis berdasarkan Jenis Kelamin", "Analisis berdasarkan ASI Eksklusif"]
+    if 'Age' in measures:
+        analysis_options.append("Analisis berdasarkan Umur")
+    analysis_options.append("Statistik Deskriptif")
+    
+    analysis_type = st.selectbox("Pilih Analisis", analysis_options)
+    numeric_cols = [c for c in NUMERIC_COLUMNS if c in measures]
+    
+    if analysis_type == "Analisis berdasarkan Jenis Kelamin":
+        st.subheader("Analisis berdasarkan Jenis Kelamin")
+        if numeric_cols:
+            sex_analysis = group_stats(filtered_agg, ['Sex', 'Stunting'], numeric_cols, stats=('mean',)).round(2)
+            st.dataframe(sex_analysis, use_container_width=True)
+    
+    elif analysis_type == "Analisis berdasarkan ASI Eksklusif":
+        st.subheader("Analisis berdasarkan ASI Eksklusif")
+        if numeric_cols:
+            asi_analysis = group_stats(filtered_agg, ['ASI_Eksklusif', 'Stunting'], numeric_cols, stats=('mean',)).round(2)
+            st.dataframe(asi_analysis, use_container_width=True)
+        
+        render_asi_percentage(aggregate_asi_percentage(filtered_agg))
+    
+    elif analysis_type == "Analisis berdasarkan Umur":
+        st.subheader("Analisis berdasarkan Kelompok Umur")
+        # Kelompok (a, b] memakai batas atas umur sel (floor + pecahan) agar sama dengan pd.cut per baris
+        cells = filtered_agg.assign(
+            Kelompok_Umur=pd.cut(age_ceil(filtered_agg), bins=AGE_BINS, labels=AGE_LABELS)
+        )
+        age_cols = [c for c in ['Body_Weight', 'Body_Length'] if c in measures]
+        if age_cols:
+            age_analysis = group_stats(cells, ['Kelompok_Umur', 'Stunting'], age_cols, stats=('mean',)).round(2)
+            st.dataframe(age_analysis, use_container_width=True)
+        
+        cells = cells.dropna(subset=['Kelompok_Umur']).assign(Stunting_Label=lambda d: stunting_label(d['Stunting']))
+        age_grouped = cells.groupby(['Kelompok_Umur', 'Stunting_Label'], observed=True)['n'].sum().reset_index(name='Jumlah')
+        age_grouped = age_grouped[age_grouped['Jumlah'] > 0]
+        render_age_distribution(age_grouped)
+    
+    elif analysis_type == "Statistik Deskriptif":
+        st.subheader("Statistik Deskriptif")
+        if numeric_cols:
+            # Kuartil dari sketsa kuantil per sel (tanpa seluruh baris), sehingga berupa perkiraan
+            st.caption("Mode streaming: kuartil (25%/50%/75%) merupakan perkiraan dari sketsa kuantil.")
+            desc_stats = overall_stats(filtered_agg, numeric_cols)
+            st.dataframe(desc_stats, use_container_width=True)
+            
+            st.subheader("Perbandingan Statistik: Stunting vs Tidak Stunting")
+            comparison = group_stats(filtered_agg, ['Stunting'], numeric_cols).round(2)
+            st.dataframe(comparison, use_container_width=True)
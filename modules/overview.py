@@ -1,12 +1,55 @@
 """Halaman Overview Dashboard"""
 import streamlit as st
-import pandas as pd
-from utils.data_loader import create_crosstab_melted, count_stunting
+from constants import STUNTING_LABELS
+from utils.aggregates import column_mean, crosstab_melted_from_aggregates, stunting_counts_from_aggregates, total_rows
+from utils.data_loader import create_crosstab_melted, stunting_counts
 from utils.visualizations import create_pie_chart, create_bar_chart
 
 
+def overview_stats(filtered_df):
+    """Angka dan tabel untuk halaman overview dari baris terpilih (None = kolom tidak ada)"""
+    columns = filtered_df.columns
+    has_stunting = 'Stunting' in columns
+    return {
+        'total': len(filtered_df),
+        'stunting_counts': stunting_counts(filtered_df['Stunting']) if has_stunting else None,
+        'avg_age': filtered_df['Age'].mean() if 'Age' in columns else None,
+        'avg_weight': filtered_df['Body_Weight'].mean() if 'Body_Weight' in columns else None,
+        'sex_melted': create_crosstab_melted(filtered_df, 'Sex') if has_stunting and 'Sex' in columns else None,
+        'asi_melted': create_crosstab_melted(filtered_df, 'ASI_Eksklusif') if has_stunting and 'ASI_Eksklusif' in columns else None,
+    }
+
+
+def aggregate_overview_stats(filtered_agg):
+    """Versi mode streaming dari overview_stats (dihitung dari agregat sel)"""
+    return {
+        'total': total_rows(filtered_agg),
+        'stunting_counts': stunting_counts_from_aggregates(filtered_agg),
+        'avg_age': column_mean(filtered_agg, 'Age') if 'Age__count' in filtered_agg.columns else None,
+        'avg_weight': column_mean(filtered_agg, 'Body_Weight') if 'Body_Weight__count' in filtered_agg.columns else None,
+        'sex_melted': crosstab_melted_from_aggregates(filtered_agg, 'Sex'),
+        'asi_melted': crosstab_melted_from_aggregates(filtered_agg, 'ASI_Eksklusif'),
+    }
+
+
 def render_overview(filtered_df):
-    """Render halaman overview"""
+    """
+    Render halaman overview. Angka dihitung dari cube (O(sel), tanpa membaca baris)
+    jika tersedia, dan disimpan di DataView untuk kunjungan berikutnya.
+    """
+    if filtered_df.cube is not None:
+        stats = filtered_df.cached('overview_stats', aggregate_overview_stats, filtered_df.cube)
+    else:
+        stats = filtered_df.cached('overview_stats', overview_stats, filtered_df)
+    render_overview_stats(stats)
+
+
+def render_overview_aggregates(filtered_agg):
+    """Render halaman overview dari agregat (mode streaming)"""
+    render_overview_stats(aggregate_overview_stats(filtered_agg))
+
+
+def render_overview_stats(stats):
     st.title("Dashboard Overview - Analisis Stunting")
     st.markdown("---")
     
@@ -14,54 +57,40 @@ def render_overview(filtered_df):
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Data", f"{len(filtered_df):,}")
+        st.metric("Total Data", f"{stats['total']:,}")
     
     with col2:
-        if 'Stunting' in filtered_df.columns:
-            stunting_count = count_stunting(filtered_df['Stunting'])
+        if stats['stunting_counts'] is not None:
+            stunting_count = int(stats['stunting_counts'][1])
             st.metric("Kasus Stunting", f"{stunting_count:,}")
         else:
             st.metric("Kasus Stunting", "N/A")
     
     with col3:
-        if 'Age' in filtered_df.columns:
-            avg_age = filtered_df['Age'].mean()
-            st.metric("Rata-rata Umur", f"{avg_age:.1f} bulan")
+        if stats['avg_age'] is not None:
+            st.metric("Rata-rata Umur", f"{stats['avg_age']:.1f} bulan")
         else:
             st.metric("Rata-rata Umur", "N/A")
     
     with col4:
-        if 'Body_Weight' in filtered_df.columns:
-            avg_weight = filtered_df['Body_Weight'].mean()
-            st.metric("Rata-rata Berat Badan", f"{avg_weight:.2f} kg")
+        if stats['avg_weight'] is not None:
+            st.metric("Rata-rata Berat Badan", f"{stats['avg_weight']:.2f} kg")
         else:
             st.metric("Rata-rata Berat Badan", "N/A")
     
     st.markdown("---")
     
     # Grafik distribusi stunting
-    if 'Stunting' in filtered_df.columns:
+    if stats['stunting_counts'] is not None:
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("Distribusi Status Stunting")
-            stunting_counts = filtered_df['Stunting'].value_counts()
+            counts = stats['stunting_counts']
             
-            # Map values ke label yang benar
-            if pd.api.types.is_numeric_dtype(filtered_df['Stunting']):
-                # Jika numerik, map 0 dan 1
-                label_map = {0: 'Tidak Stunting', 1: 'Stunting'}
-            else:
-                # Jika string, map yes/no ke label
-                positive_values = ['yes', 'stunting', '1', 'true', 'y']
-                label_map = {
-                    val: 'Stunting' if str(val).lower().strip() in positive_values else 'Tidak Stunting'
-                    for val in stunting_counts.index
-                }
-            
-            # Buat names dan values yang sesuai
-            names = [label_map.get(val, str(val)) for val in stunting_counts.index]
-            values = stunting_counts.values
+            # Kode 0/1 -> label, hanya status yang muncul di data
+            names = [label for label, count in zip(STUNTING_LABELS, counts) if count > 0]
+            values = counts[counts > 0]
             
             fig_pie = create_pie_chart(
                 values,
@@ -71,11 +100,10 @@ def render_overview(filtered_df):
             st.plotly_chart(fig_pie, use_container_width=True)
         
         with col2:
-            if 'Sex' in filtered_df.columns:
+            if stats['sex_melted'] is not None:
                 st.subheader("Distribusi berdasarkan Jenis Kelamin")
-                sex_melted = create_crosstab_melted(filtered_df, 'Sex')
                 fig_bar = create_bar_chart(
-                    sex_melted,
+                    stats['sex_melted'],
                     'Sex',
                     'Jumlah',
                     'Stunting_Label',
@@ -84,15 +112,13 @@ def render_overview(filtered_df):
                 st.plotly_chart(fig_bar, use_container_width=True)
         
         # Grafik ASI Eksklusif
-        if 'ASI_Eksklusif' in filtered_df.columns:
+        if stats['asi_melted'] is not None:
             st.subheader("Pengaruh ASI Eksklusif terhadap Stunting")
-            asi_melted = create_crosstab_melted(filtered_df, 'ASI_Eksklusif')
             fig_asi = create_bar_chart(
-                asi_melted,
+                stats['asi_melted'],
                 'ASI_Eksklusif',
                 'Jumlah',
                 'Stunting_Label',
                 "Pengaruh ASI Eksklusif terhadap Stunting"
             )
             st.plotly_chart(fig_asi, use_container_width=True)
-
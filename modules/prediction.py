@@ -1,29 +1,135 @@
 """Halaman Prediksi"""
+import io
 import streamlit as st
-import plotly.express as px
-from utils.model_utils import MODEL_AVAILABLE, load_model, preprocess_input, interpret_prediction
+import pandas as pd
+from utils.model_utils import MODEL_AVAILABLE, load_model, get_inference_service, get_prediction_cache, preprocess_input, interpret_prediction
+from utils.prediction_cache import file_fingerprint, prediction_key, quantize_inputs
+from utils.scaler import find_scaler_path
+from utils.model_loader import numpy_engine_available
+from utils.numpy_model import numpy_model_path
+from utils.features import RAW_COLUMNS
+from utils.scoring import missing_columns, iter_scored_chunks
 from constants import MODEL_PATH, COLORS
 
 
+def _count_data_rows(uploaded_file):
+    """Hitung jumlah baris data (tanpa header) per blok, untuk progress bar"""
+    uploaded_file.seek(0)
+    n_lines = 0
+    last_block = b''
+    for block in iter(lambda: uploaded_file.read(1 << 20), b''):
+        n_lines += block.count(b'\n')
+        last_block = block
+    if last_block and not last_block.endswith(b'\n'):
+        n_lines += 1
+    uploaded_file.seek(0)
+    return max(n_lines - 1, 0)
+
+
+def render_batch_prediction(model):
+    """Render mode prediksi batch dari file CSV"""
+    st.markdown("### Prediksi Batch dari File CSV")
+    st.markdown("---")
+    st.info(f"💡 **Format file:** CSV dengan kolom {', '.join(RAW_COLUMNS)} (sama seperti `dataset_stunting_balanced.csv`).")
+    
+    uploaded_file = st.file_uploader("Upload file CSV", type=['csv'])
+    if uploaded_file is None:
+        return
+    
+    try:
+        header = pd.read_csv(uploaded_file, nrows=0)
+    except Exception as e:
+        st.error(f"File CSV tidak dapat dibaca: {str(e)}")
+        return
+    uploaded_file.seek(0)
+    
+    missing = missing_columns(header.columns)
+    if missing:
+        st.error(f"Kolom berikut tidak ditemukan di file: {', '.join(missing)}")
+        return
+    
+    upload_key = (uploaded_file.name, uploaded_file.size)
+    if st.button("Proses Prediksi Batch", type="primary", use_container_width=True):
+        total_rows = _count_data_rows(uploaded_file)
+        progress = st.progress(0.0, text=f"Memproses 0 / {total_rows:,} baris")
+        
+        # Hasil CSV ditulis per chunk ke buffer di memori (hanya teks CSV, bukan DataFrame
+        # seluruh file); tidak ada file sementara di disk yang perlu dibersihkan
+        st.session_state.pop('batch_result', None)
+        out = io.BytesIO()
+        
+        processed = stunting_count = invalid_count = 0
+        try:
+            for i, scored in enumerate(iter_scored_chunks(uploaded_file, model)):
+                scored.to_csv(out, header=(i == 0), index=False, encoding='utf-8')
+                processed += len(scored)
+                stunting_count += int((scored['Prediksi'] == "Stunting").sum())
+                invalid_count += int(scored['Prediksi'].isna().sum())
+                progress.progress(
+                    min(processed / total_rows, 1.0) if total_rows else 1.0,
+                    text=f"Memproses {processed:,} / {total_rows:,} baris"
+                )
+        except Exception as e:
+            st.error(f"Error saat melakukan prediksi batch: {str(e)}")
+            return
+        
+        st.session_state.batch_result = {
+            'key': upload_key,
+            'data': out.getvalue(),
+            'processed': processed,
+            'stunting': stunting_count,
+            'invalid': invalid_count,
+        }
+    
+    result = st.session_state.get('batch_result')
+    if not result or result['key'] != upload_key:
+        return
+    
+    st.markdown("### Hasil Prediksi Batch")
+    st.markdown("---")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total Baris", f"{result['processed']:,}")
+    with col2:
+        st.metric("Prediksi Stunting", f"{result['stunting']:,}")
+    with col3:
+        st.metric("Baris Tidak Valid", f"{result['invalid']:,}")
+    
+    st.download_button(
+        label="Download Hasil Prediksi sebagai CSV",
+        data=result['data'],
+        file_name='hasil_prediksi_stunting.csv',
+        mime='text/csv',
+        use_container_width=True
+    )
+
+
 def render_prediction():
     """Render halaman prediksi"""
     st.title("Prediksi Stunting")
     st.markdown("---")
     
-    if not MODEL_AVAILABLE:
+    if not MODEL_AVAILABLE and not numpy_engine_available(MODEL_PATH):
         st.error("⚠️ TensorFlow/Keras tidak terinstall. Install dengan: `pip install tensorflow`")
         st.code("pip install tensorflow", language="bash")
         return
     
+    # Sidik jari file model: model dan layanan inferensi dimuat ulang saat file diganti
+    model_fingerprint = file_fingerprint(MODEL_PATH, numpy_model_path(MODEL_PATH))
+    
     # Tampilkan loading indicator
     with st.spinner("Memuat model..."):
-        model = load_model(MODEL_PATH)
+        model = load_model(MODEL_PATH, model_fingerprint)
     
     if model is None:
         # Error sudah ditampilkan oleh load_model
         st.info("💡 **Tips:** Pastikan file model `best_stunting_model.h5` ada di folder yang sama dengan `dashboard.py`")
         return
     
+    # Layanan inferensi bersama: request dari semua sesi digabung per jendela waktu
+    service = get_inference_service(model, MODEL_PATH, model_fingerprint)
+    prediction_cache = get_prediction_cache()
+    
     with st.expander("Informasi Model"):
         try:
             st.write(f"**Nama Model:** {MODEL_PATH}")
@@ -33,6 +139,22 @@ def render_prediction():
             st.write(f"**Jumlah Parameter:** {model.count_params():,}")
         except:
             pass
+        stats = service.stats()
+        st.write(
+            f"**Layanan Inferensi:** {stats['requests']:,} request dalam {stats['batches']:,} batch "
+            f"(rata-rata {stats['mean_batch_size']:.1f} baris, terbesar {stats['largest_batch']:,}), "
+            f"antrean saat ini {stats['queue_depth']}"
+        )
+        cache_stats = prediction_cache.stats()
+        st.write(
+            f"**Cache Prediksi:** {cache_stats['hits']:,} hit, {cache_stats['misses']:,} miss "
+            f"({cache_stats['size']:,}/{cache_stats['maxsize']:,} entri)"
+        )
+    
+    mode = st.radio("Mode Prediksi", ["Input Manual", "Upload CSV (Batch)"], horizontal=True)
+    if mode == "Upload CSV (Batch)":
+        render_batch_prediction(model)
+        return
     
     st.markdown("### Input Data untuk Prediksi")
     st.markdown("---")
@@ -84,20 +206,27 @@ def render_prediction():
     st.markdown("---")
     
     if st.button("Prediksi Stunting", type="primary", use_container_width=True):
-        input_data = preprocess_input(
+        # Nilai yang sama (sudah dibulatkan ke step widget) dipakai untuk kunci dan prediksi
+        age_input, birth_weight, birth_length, body_weight, body_length = quantize_inputs(
+            age_input, birth_weight, birth_length, body_weight, body_length
+        )
+        cache_key = prediction_key(
             sex_input, age_input, birth_weight, birth_length,
-            body_weight, body_length, asi_input
+            body_weight, body_length, asi_input,
+            file_fingerprint(MODEL_PATH, numpy_model_path(MODEL_PATH), find_scaler_path())
         )
         
         try:
-            # Cek apakah model adalah sklearn atau keras
-            if hasattr(model, 'predict_proba'):
-                # sklearn model
-                prediction = model.predict_proba(input_data)
-            else:
-                # keras model
-                prediction = model.predict(input_data, verbose=0)
-            prob_no_stunting, prob_stunting, result = interpret_prediction(prediction)
+            cached = prediction_cache.get(cache_key)
+            if cached is None:
+                input_data = preprocess_input(
+                    sex_input, age_input, birth_weight, birth_length,
+                    body_weight, body_length, asi_input
+                )
+                prediction = service.predict(input_data)
+                cached = interpret_prediction(prediction)
+                prediction_cache.put(cache_key, cached)
+            prob_no_stunting, prob_stunting, result = cached
             
             st.markdown("### Hasil Prediksi")
             st.markdown("---")
@@ -105,6 +234,7 @@ def render_prediction():
             col1, col2 = st.columns(2)
             
             with col1:
+                import plotly.express as px
                 st.metric("Prediksi", result)
                 fig = px.bar(
                     x=['Tidak Stunting', 'Stunting'],
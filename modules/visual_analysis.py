@@ -1,8 +1,55 @@
 """Halaman Analisis Visual"""
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-from utils.visualizations import create_histogram, create_scatter, create_box_plot
+from constants import STUNTING_LABELS
+from utils.aggregates import box_summaries, correlation_from_aggregates, sketches_in
+from utils.group_stats import histogram_counts
+from utils.visualizations import create_histogram, create_scatter, create_box_plot, create_box_plot_from_summaries
+
+
+def plot_frame(filtered_df, columns):
+    """DataFrame berisi kolom yang dipakai grafik saja (kolom yang tidak ada dilewati)"""
+    return filtered_df.frame([c for c in columns if c in filtered_df.columns])
+
+
+def stunting_histogram(filtered_df, col, title):
+    """Histogram `col` per status stunting; bin dihitung di server dengan tepi bin tetap per kolom"""
+    edges, counts = filtered_df.cached(('histogram', col), histogram_counts, filtered_df, col)
+    return create_histogram(
+        edges, {STUNTING_LABELS[int(code)]: values for code, values in counts.items()}, col, title
+    )
+
+
+def stunting_box_plot(filtered_df, col, title):
+    """
+    Box plot `col` per status stunting. Dengan cube, kuartil diambil dari sketsa kuantil
+    per sel sehingga ukuran figure tidak bergantung pada jumlah baris.
+    """
+    cube = filtered_df.cube
+    if cube is not None and col in sketches_in(cube):
+        summaries = filtered_df.cached(('box', col), box_summaries, cube, col)
+        return create_box_plot_from_summaries(
+            {STUNTING_LABELS[int(code)]: summary for code, summary in summaries.items()},
+            'Stunting_Label', col, title
+        )
+    return create_box_plot(plot_frame(filtered_df, [col, 'Stunting_Label']), 'Stunting_Label', col, 'Stunting_Label', title)
+
+
+def correlation_matrix(filtered_df, numeric_cols):
+    """
+    Matriks korelasi kolom numerik; None jika tersisa kurang dari 2 kolom yang valid.
+    Dengan cube, dirakit dari co-moment per sel tanpa membaca baris mentah.
+    """
+    if filtered_df.cube is not None:
+        return correlation_from_aggregates(filtered_df.cube, numeric_cols)
+    
+    # Tanpa cube: hitung dari baris; kolom yang semua nilainya NaN dibuang
+    df_numeric = filtered_df[numeric_cols].apply(pd.to_numeric, errors='coerce')
+    df_numeric = df_numeric.dropna(axis=1, how='all')
+    
+    if len(df_numeric.columns) < 2 or len(df_numeric) == 0:
+        return None
+    return df_numeric.corr()
 
 
 def render_visual_analysis(filtered_df):
@@ -32,16 +79,16 @@ def render_visual_analysis(filtered_df):
     
     if viz_type == "Distribusi Umur":
         st.subheader("Distribusi Umur berdasarkan Status Stunting")
-        fig = create_histogram(filtered_df, 'Age', 'Stunting', "Distribusi Umur")
+        fig = stunting_histogram(filtered_df, 'Age', "Distribusi Umur")
         st.plotly_chart(fig, use_container_width=True)
     
     elif viz_type == "Hubungan Berat & Panjang Badan":
         st.subheader("Hubungan Berat Badan vs Panjang Badan")
         fig = create_scatter(
-            filtered_df,
+            plot_frame(filtered_df, ['Body_Length', 'Body_Weight', 'Stunting_Label', 'Age', 'Sex', 'ASI_Eksklusif']),
             'Body_Length',
             'Body_Weight',
-            'Stunting',
+            'Stunting_Label',
             'Age' if 'Age' in filtered_df.columns else None,
             "Hubungan Berat Badan vs Panjang Badan"
         )
@@ -50,10 +97,10 @@ def render_visual_analysis(filtered_df):
     elif viz_type == "Hubungan Berat & Panjang Lahir":
         st.subheader("Hubungan Berat Lahir vs Panjang Lahir")
         fig = create_scatter(
-            filtered_df,
+            plot_frame(filtered_df, ['Birth_Length', 'Birth_Weight', 'Stunting_Label', 'Age', 'Sex', 'ASI_Eksklusif']),
             'Birth_Length',
             'Birth_Weight',
-            'Stunting',
+            'Stunting_Label',
             'Age' if 'Age' in filtered_df.columns else None,
             "Hubungan Berat Lahir vs Panjang Lahir"
         )
@@ -63,20 +110,20 @@ def render_visual_analysis(filtered_df):
         st.subheader("Distribusi Berat Badan")
         col1, col2 = st.columns(2)
         with col1:
-            fig1 = create_box_plot(filtered_df, 'Stunting', 'Body_Weight', 'Stunting', "Box Plot Berat Badan")
+            fig1 = stunting_box_plot(filtered_df, 'Body_Weight', "Box Plot Berat Badan")
             st.plotly_chart(fig1, use_container_width=True)
         with col2:
-            fig2 = create_histogram(filtered_df, 'Body_Weight', 'Stunting', "Histogram Berat Badan")
+            fig2 = stunting_histogram(filtered_df, 'Body_Weight', "Histogram Berat Badan")
             st.plotly_chart(fig2, use_container_width=True)
     
     elif viz_type == "Distribusi Panjang Badan":
         st.subheader("Distribusi Panjang Badan")
         col1, col2 = st.columns(2)
         with col1:
-            fig1 = create_box_plot(filtered_df, 'Stunting', 'Body_Length', 'Stunting', "Box Plot Panjang Badan")
+            fig1 = stunting_box_plot(filtered_df, 'Body_Length', "Box Plot Panjang Badan")
             st.plotly_chart(fig1, use_container_width=True)
         with col2:
-            fig2 = create_histogram(filtered_df, 'Body_Length', 'Stunting', "Histogram Panjang Badan")
+            fig2 = stunting_histogram(filtered_df, 'Body_Length', "Histogram Panjang Badan")
             st.plotly_chart(fig2, use_container_width=True)
     
     elif viz_type == "Heatmap Korelasi":
@@ -85,38 +132,19 @@ def render_visual_analysis(filtered_df):
         # Ambil kolom yang mungkin numeric
         potential_cols = ['Age', 'Birth_Weight', 'Birth_Length', 'Body_Weight', 'Body_Length']
         
-        # Filter hanya kolom yang benar-benar numeric dan ada di dataframe
-        numeric_cols = []
-        for col in potential_cols:
-            if col in filtered_df.columns:
-                # Cek apakah kolom numeric
-                if pd.api.types.is_numeric_dtype(filtered_df[col]):
-                    # Coba konversi ke float untuk memastikan
-                    try:
-                        test_series = pd.to_numeric(filtered_df[col], errors='coerce')
-                        if not test_series.isna().all():  # Pastikan ada nilai yang valid
-                            numeric_cols.append(col)
-                    except:
-                        pass
+        # Filter hanya kolom numeric yang ada di dataframe; kolom tanpa nilai valid dibuang saat korelasi dihitung
+        numeric_cols = [
+            col for col in potential_cols
+            if col in filtered_df.columns and pd.api.types.is_numeric_dtype(filtered_df.df[col])
+        ]
         
         if len(numeric_cols) >= 2:
             try:
-                # Ambil subset dataframe dengan kolom numeric saja
-                df_numeric = filtered_df[numeric_cols].copy()
-                
-                # Pastikan semua kolom bisa dikonversi ke float
-                for col in df_numeric.columns:
-                    df_numeric[col] = pd.to_numeric(df_numeric[col], errors='coerce')
-                
-                # Hapus baris dengan semua nilai NaN
-                df_numeric = df_numeric.dropna(how='all')
-                
-                # Hapus kolom yang semua nilainya NaN
-                df_numeric = df_numeric.dropna(axis=1, how='all')
+                corr_matrix = filtered_df.cached(('correlation', tuple(numeric_cols)), correlation_matrix, filtered_df, numeric_cols)
                 
                 # Pastikan masih ada minimal 2 kolom
-                if len(df_numeric.columns) >= 2 and len(df_numeric) > 0:
-                    corr_matrix = df_numeric.corr()
+                if corr_matrix is not None:
+                    import plotly.express as px
                     fig = px.imshow(
                         corr_matrix,
                         text_auto=True,
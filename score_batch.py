@@ -0,0 +1,164 @@
+"""Script scoring batch tanpa Streamlit untuk file CSV berukuran besar
+
+Contoh:
+    python score_batch.py registry.csv hasil.parquet --workers 8
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from constants import MODEL_PATH, SCORING_CHUNK_SIZE, PREDICT_BATCH_SIZE
+from utils.model_loader import ModelLoadError, load_model_file
+from utils.numpy_model import numpy_model_path
+from utils.scoring import iter_csv_chunks, missing_columns, score_frame
+
+# Model per proses worker, dimuat sekali oleh _init_worker
+_worker_model = None
+_worker_error = None
+
+
+def _init_worker(model_path):
+    """Initializer process pool: load model sekali per worker"""
+    global _worker_model, _worker_error
+    try:
+        _worker_model, _ = load_model_file(model_path)
+    except ModelLoadError as e:
+        # Disimpan agar diteruskan ke proses utama lewat hasil chunk
+        _worker_error = e
+
+
+def _score_chunk(chunk, batch_size):
+    """Scoring satu chunk di dalam worker"""
+    if _worker_error is not None:
+        raise _worker_error
+    return score_frame(chunk, _worker_model, batch_size)
+
+
+class ResultWriter:
+    """
+    Tulis chunk hasil secara berurutan ke CSV atau Parquet. Hasil ditulis ke file sementara
+    di folder yang sama dan baru di-rename ke path tujuan lewat close(success=True), sehingga
+    run yang gagal tidak meninggalkan file output terpotong.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.temp_path = f"{path}.tmp"
+        self.is_parquet = path.lower().endswith(('.parquet', '.pq'))
+        self._csv_file = None
+        self._parquet_writer = None
+
+    def write(self, df):
+        if self.is_parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.temp_path, table.schema)
+            else:
+                # Samakan schema chunk berikutnya dengan chunk pertama
+                table = table.cast(self._parquet_writer.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            if self._csv_file is None:
+                self._csv_file = open(self.temp_path, 'w', newline='', encoding='utf-8')
+                df.to_csv(self._csv_file, index=False)
+            else:
+                df.to_csv(self._csv_file, header=False, index=False)
+
+    def close(self, success=True):
+        written = self._parquet_writer is not None or self._csv_file is not None
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        if self._csv_file is not None:
+            self._csv_file.close()
+        if not written:
+            return
+        if success:
+            os.replace(self.temp_path, self.path)
+        elif os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+
+def score_file(input_path, output_path, model_path=MODEL_PATH, workers=None,
+               chunksize=SCORING_CHUNK_SIZE, batch_size=PREDICT_BATCH_SIZE, log=print):
+    """
+    Scoring CSV per chunk memakai process pool; hasil ditulis sesuai urutan input.
+    Jumlah chunk yang sedang diproses dibatasi agar memori tetap terbatas.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = iter_csv_chunks(input_path, chunksize)
+    writer = ResultWriter(output_path)
+    total_rows = 0
+    start = time.perf_counter()
+    
+    # Spawn (bukan fork) karena TensorFlow tidak aman di-fork
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=(model_path,),
+    )
+    success = False
+    try:
+        pending = deque()
+        for i, chunk in enumerate(chunks):
+            if i == 0:
+                missing = missing_columns(chunk.columns)
+                if missing:
+                    raise ValueError(f"Kolom berikut tidak ditemukan di file: {', '.join(missing)}")
+            pending.append(executor.submit(_score_chunk, chunk, batch_size))
+            # Maksimal 2 chunk per worker yang antre
+            while len(pending) >= workers * 2:
+                total_rows += _flush(pending.popleft(), writer)
+                log(f"{total_rows:,} baris selesai ({time.perf_counter() - start:.1f} s)")
+        while pending:
+            total_rows += _flush(pending.popleft(), writer)
+            log(f"{total_rows:,} baris selesai ({time.perf_counter() - start:.1f} s)")
+        success = True
+    finally:
+        executor.shutdown(cancel_futures=True)
+        writer.close(success)
+    return total_rows
+
+
+def _flush(future, writer):
+    """Tunggu hasil satu chunk lalu tulis"""
+    scored = future.result()
+    writer.write(scored)
+    return len(scored)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scoring batch data stunting dari file CSV")
+    parser.add_argument('input', help="File CSV input (skema dataset_stunting_balanced.csv)")
+    parser.add_argument('output', help="File output (.csv atau .parquet)")
+    parser.add_argument('--model', default=MODEL_PATH, help=f"Path model (default: {MODEL_PATH})")
+    parser.add_argument('--workers', type=int, default=None, help="Jumlah proses worker (default: jumlah CPU)")
+    parser.add_argument('--chunksize', type=int, default=SCORING_CHUNK_SIZE, help="Jumlah baris per chunk")
+    parser.add_argument('--batch-size', type=int, default=PREDICT_BATCH_SIZE, help="Ukuran batch untuk model")
+    args = parser.parse_args(argv)
+    
+    # Artefak mesin NumPy (.npz) saja sudah cukup untuk scoring tanpa file H5
+    if not os.path.exists(args.model) and not os.path.exists(numpy_model_path(args.model)):
+        print(f"File model {args.model} (atau {numpy_model_path(args.model)}) tidak ditemukan.", file=sys.stderr)
+        return 1
+    try:
+        total = score_file(args.input, args.output, args.model, args.workers, args.chunksize, args.batch_size)
+    except ModelLoadError as e:
+        print(f"Error loading model: {args.model}", file=sys.stderr)
+        for i, err in enumerate(e.errors, 1):
+            print(f"  {i}. {err}", file=sys.stderr)
+        return 1
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    print(f"Hasil disimpan ke {args.output} ({total:,} baris)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,397 @@
+"""Agregat parsial yang bisa digabung (mode streaming dan cube untuk sidebar/Overview)
+
+Data diringkas per sel (sumber, jenis kelamin, ASI, stunting, umur dibulatkan ke bawah
++ penanda pecahan). Setiap sel menyimpan jumlah baris serta count/mean/M2/min/max per
+kolom numerik; dua ringkasan digabung dengan rumus Chan dkk. sehingga hasilnya sama
+dengan menghitung ulang dari seluruh baris. Pada mode biasa, agregat yang sama dibangun
+sekali dari dataset di memori (load_cube) sehingga metrik sidebar dan Overview untuk
+filter apa pun dijawab dengan memfilter dan menjumlahkan sel, bukan memindai baris.
+"""
+import os
+import time
+from itertools import combinations
+import numpy as np
+import pandas as pd
+import streamlit as st
+from constants import STREAM_CHUNK_SIZE, STREAMING_THRESHOLD_MB
+from utils.data_loader import (
+    melt_stunting_counts, normalize_column_names, normalize_stunting, read_dataset_chunks, source_name
+)
+from utils.dataset_cache import source_files
+from utils.dedup import DedupIndex, row_hashes
+from utils.quantile_sketch import QuantileSketch, box_summary
+
+CELL_KEYS = ['Dataset_Source', 'Sex', 'ASI_Eksklusif', 'Stunting', 'Age_Floor', 'Age_Frac']
+MEASURE_COLUMNS = ['Age', 'Birth_Weight', 'Birth_Length', 'Body_Weight', 'Body_Length']
+STATS = ['count', 'mean', 'm2', 'min', 'max']
+
+# Statistik cukup per pasangan kolom ukur (baris yang keduanya terisi): jumlah baris,
+# mean dan M2 masing-masing kolom, serta co-moment C = sum((x - mean_x) * (y - mean_y))
+MEASURE_PAIRS = list(combinations(MEASURE_COLUMNS, 2))
+PAIR_STATS = ['n', 'mean_x', 'mean_y', 'm2_x', 'm2_y', 'c']
+
+
+def stat_column(col, stat):
+    return f'{col}__{stat}'
+
+
+def pair_column(x, y, stat):
+    return f'{x}*{y}__{stat}'
+
+
+def _split_groups(group_ids, values, n_groups):
+    """Pecah values per id kelompok (0..n_groups-1) dengan satu argsort"""
+    order = np.argsort(group_ids, kind='stable')
+    sizes = np.bincount(group_ids, minlength=n_groups)
+    return np.split(values[order], np.cumsum(sizes)[:-1])
+
+
+def cell_keys(df):
+    """Kolom kunci sel untuk setiap baris. Umur: floor + penanda pecahan (0/1), NaN tetap NaN"""
+    n = len(df)
+    age = df['Age'].to_numpy(dtype=np.float64) if 'Age' in df.columns else np.full(n, np.nan)
+    age_floor = np.floor(age)
+    keys = pd.DataFrame({
+        'Dataset_Source': df['Dataset_Source'].astype(object).to_numpy(),
+        'Sex': df['Sex'].astype(object).to_numpy() if 'Sex' in df.columns else np.full(n, None),
+        'ASI_Eksklusif': df['ASI_Eksklusif'].astype(object).to_numpy() if 'ASI_Eksklusif' in df.columns else np.full(n, None),
+        'Stunting': df['Stunting'].to_numpy(),
+        'Age_Floor': age_floor,
+        'Age_Frac': (age > age_floor).astype(np.int8),
+    })
+    return keys
+
+
+def chunk_aggregates(df):
+    """Agregat sel dari satu chunk (Stunting sudah berupa kode int8)"""
+    frame = cell_keys(df)
+    measures = [c for c in MEASURE_COLUMNS if c in df.columns]
+    for col in measures:
+        frame[col] = df[col].to_numpy(dtype=np.float64)
+    grouped = frame.groupby(CELL_KEYS, dropna=False, sort=False)
+    agg = grouped.size().rename('n').to_frame()
+    # Urutan ngroup sama dengan urutan sel di agg (sort=False)
+    group_ids = grouped.ngroup().to_numpy()
+    for col in measures:
+        count = grouped[col].count()
+        agg[stat_column(col, 'count')] = count
+        agg[stat_column(col, 'mean')] = grouped[col].mean()
+        agg[stat_column(col, 'm2')] = (grouped[col].var(ddof=0) * count).fillna(0.0)
+        agg[stat_column(col, 'min')] = grouped[col].min()
+        agg[stat_column(col, 'max')] = grouped[col].max()
+        # Sketsa kuantil per sel untuk box plot dan kuartil
+        values = _split_groups(group_ids, frame[col].to_numpy(), len(agg))
+        agg[stat_column(col, 'sketch')] = [QuantileSketch.from_values(v) for v in values]
+    
+    pairs = [(x, y) for x, y in MEASURE_PAIRS if x in measures and y in measures]
+    if pairs:
+        # Nilai x/y per pasangan hanya pada baris yang keduanya terisi (seperti df.corr pairwise)
+        values = {}
+        for x, y in pairs:
+            both = frame[x].notna() & frame[y].notna()
+            values[pair_column(x, y, 'x')] = frame[x].where(both)
+            values[pair_column(x, y, 'y')] = frame[y].where(both)
+        values = pd.DataFrame(values)
+        # Kunci dan sort=False yang sama: urutan sel sama dengan `grouped`
+        grouped_values = values.groupby([frame[k] for k in CELL_KEYS], dropna=False, sort=False)
+        counts, means = grouped_values.count(), grouped_values.mean()
+        # Co-moment dihitung dari nilai yang sudah dikurangi mean sel (dua lintasan, stabil)
+        centered = values - grouped_values.transform('mean')
+        products = {}
+        for x, y in pairs:
+            dx, dy = centered[pair_column(x, y, 'x')], centered[pair_column(x, y, 'y')]
+            products[pair_column(x, y, 'm2_x')] = dx * dx
+            products[pair_column(x, y, 'm2_y')] = dy * dy
+            products[pair_column(x, y, 'c')] = dx * dy
+        sums = pd.DataFrame(products).groupby([frame[k] for k in CELL_KEYS], dropna=False, sort=False).sum()
+        stats = {}
+        for x, y in pairs:
+            stats[pair_column(x, y, 'n')] = counts[pair_column(x, y, 'x')].to_numpy()
+            stats[pair_column(x, y, 'mean_x')] = means[pair_column(x, y, 'x')].to_numpy()
+            stats[pair_column(x, y, 'mean_y')] = means[pair_column(x, y, 'y')].to_numpy()
+            for stat in ('m2_x', 'm2_y', 'c'):
+                stats[pair_column(x, y, stat)] = sums[pair_column(x, y, stat)].to_numpy()
+        agg = pd.concat([agg, pd.DataFrame(stats, index=agg.index)], axis=1)
+    return agg.reset_index()
+
+
+def measures_in(agg):
+    return [c for c in MEASURE_COLUMNS if stat_column(c, 'count') in agg.columns]
+
+
+def sketches_in(agg):
+    return [c for c in MEASURE_COLUMNS if stat_column(c, 'sketch') in agg.columns]
+
+
+def without_sketches(agg):
+    """Agregat tanpa kolom sketsa (untuk statistik yang tidak butuh kuantil)"""
+    return agg.drop(columns=[stat_column(c, 'sketch') for c in sketches_in(agg)])
+
+
+def pairs_in(agg):
+    return [(x, y) for x, y in MEASURE_PAIRS if pair_column(x, y, 'n') in agg.columns]
+
+
+def merge_aggregates(parts, keys=CELL_KEYS):
+    """
+    Gabungkan beberapa agregat per `keys` dengan rumus Chan dkk. versi k-partisi:
+    mean = sum(n_i * mean_i) / n, M2 = sum(M2_i) + sum(n_i * (mean_i - mean)^2).
+    Co-moment pasangan kolom digabung dengan cara yang sama: C = sum(C_i) + sum(n_i * dx_i * dy_i).
+    Sketsa kuantil per kelompok digabung dengan QuantileSketch.merge_all.
+    Dengan keys yang lebih sedikit, fungsi ini sekaligus meringkas ke level yang lebih kasar.
+    """
+    frame = pd.concat(parts, ignore_index=True) if isinstance(parts, (list, tuple)) else parts.copy()
+    measures = measures_in(frame)
+    pairs = pairs_in(frame)
+    
+    # Tahap 1: mean gabungan per kelompok untuk menghitung suku deviasi M2 dan co-moment.
+    # Kolom bantu dikumpulkan dulu lalu digabung sekali ke frame
+    group_keys = [frame[k] for k in keys]
+    weighted, weights = {}, {}
+    for col in measures:
+        count = frame[stat_column(col, 'count')]
+        weighted[f'_w_{col}'] = (frame[stat_column(col, 'mean')] * count).fillna(0.0)
+        weights[f'_w_{col}'] = count
+    for x, y in pairs:
+        n = frame[pair_column(x, y, 'n')]
+        for axis in ('x', 'y'):
+            weighted[f'_w_{x}*{y}_{axis}'] = (frame[pair_column(x, y, f'mean_{axis}')] * n).fillna(0.0)
+            weights[f'_w_{x}*{y}_{axis}'] = n
+    weighted = pd.DataFrame(weighted, index=frame.index)
+    means = (
+        weighted.groupby(group_keys, dropna=False, sort=False).transform('sum')
+        / pd.DataFrame(weights, index=frame.index).groupby(group_keys, dropna=False, sort=False).transform('sum')
+    )
+    
+    helpers = {name: weighted[name] for name in weighted.columns}
+    for col in measures:
+        count = frame[stat_column(col, 'count')]
+        deviation = (count * (frame[stat_column(col, 'mean')] - means[f'_w_{col}']) ** 2).fillna(0.0)
+        helpers[f'_m2_{col}'] = frame[stat_column(col, 'm2')] + deviation
+    for x, y in pairs:
+        n = frame[pair_column(x, y, 'n')]
+        dx = (frame[pair_column(x, y, 'mean_x')] - means[f'_w_{x}*{y}_x']).fillna(0.0)
+        dy = (frame[pair_column(x, y, 'mean_y')] - means[f'_w_{x}*{y}_y']).fillna(0.0)
+        helpers[f'_m2_{x}*{y}_x'] = frame[pair_column(x, y, 'm2_x')] + n * dx ** 2
+        helpers[f'_m2_{x}*{y}_y'] = frame[pair_column(x, y, 'm2_y')] + n * dy ** 2
+        helpers[f'_c_{x}*{y}'] = frame[pair_column(x, y, 'c')] + n * dx * dy
+    frame = pd.concat([frame, pd.DataFrame(helpers, index=frame.index)], axis=1)
+    
+    # Tahap 2: jumlahkan per kelompok
+    spec = {'n': 'sum'}
+    for col in measures:
+        spec[stat_column(col, 'count')] = 'sum'
+        spec[f'_w_{col}'] = 'sum'
+        spec[f'_m2_{col}'] = 'sum'
+        spec[stat_column(col, 'min')] = 'min'
+        spec[stat_column(col, 'max')] = 'max'
+    for x, y in pairs:
+        spec[pair_column(x, y, 'n')] = 'sum'
+        for column in (f'_w_{x}*{y}_x', f'_w_{x}*{y}_y', f'_m2_{x}*{y}_x', f'_m2_{x}*{y}_y', f'_c_{x}*{y}'):
+            spec[column] = 'sum'
+    grouped = frame.groupby(keys, dropna=False, sort=False)
+    merged = grouped.agg(spec)
+    
+    result = merged[['n']].copy()
+    for col in measures:
+        count = merged[stat_column(col, 'count')]
+        result[stat_column(col, 'count')] = count
+        result[stat_column(col, 'mean')] = merged[f'_w_{col}'] / count.replace(0, np.nan)
+        result[stat_column(col, 'm2')] = merged[f'_m2_{col}']
+        result[stat_column(col, 'min')] = merged[stat_column(col, 'min')]
+        result[stat_column(col, 'max')] = merged[stat_column(col, 'max')]
+    for x, y in pairs:
+        n = merged[pair_column(x, y, 'n')]
+        result[pair_column(x, y, 'n')] = n
+        result[pair_column(x, y, 'mean_x')] = merged[f'_w_{x}*{y}_x'] / n.replace(0, np.nan)
+        result[pair_column(x, y, 'mean_y')] = merged[f'_w_{x}*{y}_y'] / n.replace(0, np.nan)
+        result[pair_column(x, y, 'm2_x')] = merged[f'_m2_{x}*{y}_x']
+        result[pair_column(x, y, 'm2_y')] = merged[f'_m2_{x}*{y}_y']
+        result[pair_column(x, y, 'c')] = merged[f'_c_{x}*{y}']
+    sketches = sketches_in(frame)
+    if sketches:
+        group_ids = grouped.ngroup().to_numpy()
+        for col in sketches:
+            parts = _split_groups(group_ids, frame[stat_column(col, 'sketch')].to_numpy(), len(result))
+            result[stat_column(col, 'sketch')] = [QuantileSketch.merge_all(part) for part in parts]
+    return result.reset_index()
+
+
+def stream_aggregates(file_paths, chunksize=STREAM_CHUNK_SIZE):
+    """
+    Baca file sumber per chunk dan akumulasikan agregat sel tanpa menyimpan baris.
+    Deduplikasi tetap memakai hash baris (8 byte per baris unik), sehingga hasil
+    sama dengan mode biasa; memori selain itu sebanding jumlah sel.
+    """
+    dedup_index = DedupIndex()
+    aggregates = None
+    report = []
+    for file_path in file_paths:
+        source = source_name(file_path)
+        start = time.perf_counter()
+        rows = 0
+        for chunk in read_dataset_chunks(file_path, chunksize):
+            chunk = normalize_column_names(chunk)
+            chunk['Dataset_Source'] = source
+            rows += len(chunk)
+            chunk = chunk[dedup_index.add(row_hashes(chunk), source)]
+            if 'Stunting' not in chunk.columns:
+                # Sumber tanpa kolom Stunting: label kosong, sama seperti nilai NaN hasil concat di mode biasa
+                chunk['Stunting'] = np.nan
+            chunk['Stunting'] = normalize_stunting(chunk['Stunting'])
+            part = chunk_aggregates(chunk)
+            aggregates = part if aggregates is None else merge_aggregates([aggregates, part])
+        report.append({
+            'Sumber': source,
+            'Baris': rows,
+            'Waktu (s)': round(time.perf_counter() - start, 4),
+            'Engine': 'c (chunked)',
+        })
+    if aggregates is None:
+        return pd.DataFrame(columns=CELL_KEYS + ['n'])
+    matrix = dedup_index.duplicate_matrix()
+    aggregates.attrs['ingest_report'] = report
+    aggregates.attrs['duplicate_matrix'] = {'sources': list(matrix.index), 'counts': matrix.to_numpy().tolist()}
+    return aggregates
+
+
+def use_streaming_mode(file_paths=None):
+    """True jika total ukuran file sumber melebihi STREAMING_THRESHOLD_MB"""
+    if file_paths is None:
+        file_paths = source_files()
+    total_bytes = sum(os.path.getsize(path) for path in file_paths)
+    return total_bytes > STREAMING_THRESHOLD_MB * 1024 * 1024
+
+
+@st.cache_data
+def load_aggregates(version=None):
+    """Agregat sel seluruh sumber (mode streaming); `version` hanya menjadi kunci cache"""
+    return stream_aggregates(source_files())
+
+
+@st.cache_resource(max_entries=1)
+def load_cube(_df, version=None):
+    """
+    Cube sel (kunci CELL_KEYS) dari dataset hasil load_data(version), dibangun sekali dan
+    dibagi ke semua sesi; None jika dataset tidak punya kolom Stunting. Frame diterima dari
+    pemanggil (kunci cache = version) seperti load_filter_index.
+    """
+    if 'Stunting' not in _df.columns or 'Dataset_Source' not in _df.columns:
+        return None
+    return chunk_aggregates(_df)
+
+
+def age_ceil(agg):
+    """Batas atas umur dalam sel (floor + penanda pecahan), untuk filter dan kelompok umur"""
+    return agg['Age_Floor'] + agg['Age_Frac']
+
+
+def total_rows(agg):
+    return int(agg['n'].sum())
+
+
+def stunting_counts_from_aggregates(agg):
+    """Array [jumlah tidak stunting, jumlah stunting]"""
+    return agg.groupby('Stunting')['n'].sum().reindex([0, 1], fill_value=0).to_numpy()
+
+
+def column_mean(agg, col):
+    count = agg[stat_column(col, 'count')]
+    total = count.sum()
+    return float((agg[stat_column(col, 'mean')] * count).sum() / total) if total else float('nan')
+
+
+def group_stats(agg, by, columns, stats=('mean', 'std', 'min', 'max')):
+    """
+    Statistik per kelompok seperti df.groupby(by)[columns].agg(stats); std memakai ddof=1.
+    Kelompok dengan nilai kunci NaN dibuang (seperti groupby biasa), begitu juga sel
+    tanpa label Stunting (kode -1) jika Stunting menjadi kunci.
+    """
+    agg = without_sketches(agg).dropna(subset=by)
+    if 'Stunting' in by:
+        agg = agg[agg['Stunting'] >= 0]
+    merged = merge_aggregates(agg, keys=by).set_index(by).sort_index()
+    data = {}
+    for col in columns:
+        count = merged[stat_column(col, 'count')]
+        values = {
+            'count': count,
+            'mean': merged[stat_column(col, 'mean')],
+            'std': np.sqrt(merged[stat_column(col, 'm2')] / (count - 1).where(count > 1)),
+            'min': merged[stat_column(col, 'min')],
+            'max': merged[stat_column(col, 'max')],
+        }
+        for stat in stats:
+            data[(col, stat)] = values[stat]
+    result = pd.DataFrame(data, index=merged.index)
+    if len(stats) == 1:
+        result.columns = [col for col, _ in result.columns]
+    return result
+
+
+def overall_stats(agg, columns):
+    """
+    Seperti df[columns].describe(): count, mean, std (ddof=1), min, max, serta kuartil
+    25%/50%/75% (perkiraan dari sketsa kuantil) jika agregat menyimpan sketsa.
+    """
+    names = ['count', 'mean', 'std', 'min', 'max']
+    quartiles = ['25%', '50%', '75%']
+    with_quartiles = set(columns) <= set(sketches_in(agg))
+    index = names[:4] + quartiles + names[4:] if with_quartiles else names
+    stats = group_stats(agg.assign(_semua=0), ['_semua'], columns, stats=tuple(names))
+    if not len(stats):
+        return pd.DataFrame(index=index, columns=columns)
+    result = stats.iloc[0].unstack(0)
+    if with_quartiles:
+        result = pd.concat([result, pd.DataFrame({
+            col: QuantileSketch.merge_all(agg[stat_column(col, 'sketch')]).quantiles([0.25, 0.5, 0.75])
+            for col in columns
+        }, index=quartiles)])
+    return result.reindex(index=index, columns=columns)
+
+
+def box_summaries(agg, col, by='Stunting'):
+    """Ringkasan box plot (box_summary) kolom `col` per nilai `by`, dari sketsa sel"""
+    summaries = {}
+    for value, cells in agg.dropna(subset=[by]).groupby(by, sort=True):
+        if by == 'Stunting' and value < 0:
+            continue
+        sketch = QuantileSketch.merge_all(cells[stat_column(col, 'sketch')])
+        summary = box_summary(sketch, cells[stat_column(col, 'min')].min(), cells[stat_column(col, 'max')].max())
+        if summary is not None:
+            summaries[value] = summary
+    return summaries
+
+
+def correlation_from_aggregates(agg, columns):
+    """
+    Matriks korelasi Pearson seperti df[columns].corr() (pairwise-complete) dari co-moment
+    sel: semua sel digabung dulu dengan merge_aggregates, tanpa membaca baris mentah.
+    None jika kurang dari 2 kolom yang punya nilai.
+    """
+    if not len(agg):
+        return None
+    merged = merge_aggregates(without_sketches(agg).assign(_semua=0), keys=['_semua']).iloc[0]
+    columns = [c for c in columns if merged.get(stat_column(c, 'count'), 0) > 0]
+    if len(columns) < 2:
+        return None
+    matrix = pd.DataFrame(np.nan, index=columns, columns=columns)
+    for col in columns:
+        if merged[stat_column(col, 'm2')] > 0:
+            matrix.loc[col, col] = 1.0
+    for x, y in combinations(columns, 2):
+        # Pasangan disimpan dalam urutan MEASURE_COLUMNS
+        if (x, y) not in MEASURE_PAIRS:
+            x, y = y, x
+        n = merged[pair_column(x, y, 'n')]
+        denominator = np.sqrt(merged[pair_column(x, y, 'm2_x')] * merged[pair_column(x, y, 'm2_y')])
+        if n >= 2 and denominator > 0:
+            matrix.loc[x, y] = matrix.loc[y, x] = merged[pair_column(x, y, 'c')] / denominator
+    return matrix
+
+
+def crosstab_melted_from_aggregates(agg, index_col, value_col='Stunting'):
+    """Versi agregat dari create_crosstab_melted (format output sama)"""
+    counts = agg.dropna(subset=[index_col]).groupby([index_col, value_col])['n'].sum().unstack(fill_value=0)
+    counts = counts.reindex(columns=[0, 1], fill_value=0).sort_index()
+    return melt_stunting_counts(counts.index, counts.to_numpy(), index_col, value_col)
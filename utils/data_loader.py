@@ -1,56 +1,317 @@
 """Fungsi untuk loading dan preprocessing data"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
+import numpy as np
 import pandas as pd
-from constants import DATASETS
+from constants import DATASETS, DATASET_COLUMNS, DATA_STORE_DIR, INGEST_MAX_WORKERS, STUNTING_LABELS
+from utils.dedup import DedupIndex, row_hashes
+from utils.dataset_cache import (
+    dataset_version, load_manifest, partition_is_current, pyarrow_available,
+    read_partition, read_partition_hashes, remove_partitions, save_manifest, source_files, write_partition
+)
+from utils.shared_frame import freeze_frame
+
+STUNTING_POSITIVE_VALUES = ['yes', 'stunting', '1', 'true', 'y']
+
+# Kolom dengan sedikit nilai unik yang disimpan sebagai category
+CATEGORY_COLUMNS = ['Sex', 'ASI_Eksklusif', 'Dataset_Source']
+
+# Satu proses hanya boleh menulis store sekaligus (banyak sesi bisa memanggil load_data)
+_store_lock = threading.Lock()
+
+
+def stunting_counts(stunting_series):
+    """Return array [jumlah tidak stunting, jumlah stunting] dengan bincount kode int8 (kode -1 diabaikan)"""
+    if stunting_series.dtype != np.int8:
+        stunting_series = normalize_stunting(stunting_series)
+    codes = stunting_series.to_numpy()
+    return np.bincount(codes[codes >= 0], minlength=2)[:2]
 
 
 def count_stunting(stunting_series):
-    """Hitung jumlah kasus stunting, handle baik numerik maupun string"""
-    if stunting_series.empty:
-        return 0
-    
-    # Cek apakah kolom numerik
-    if pd.api.types.is_numeric_dtype(stunting_series):
-        # Jika numerik, hitung yang == 1 atau > 0
-        return int((stunting_series == 1).sum() if (stunting_series == 1).any() else (stunting_series > 0).sum())
-    else:
-        # Jika string, hitung yang bernilai positif (case-insensitive)
-        stunting_series_lower = stunting_series.astype(str).str.lower().str.strip()
-        positive_values = ['yes', 'stunting', '1', 'true', 'y']
-        return int(stunting_series_lower.isin(positive_values).sum())
+    """Hitung jumlah kasus stunting dari kolom Stunting (kode 0/1)"""
+    return int(stunting_counts(stunting_series)[1])
 
 
-@st.cache_data
-def load_data():
-    """Load dan gabungkan semua dataset menjadi satu"""
-    dfs = []
+@st.cache_resource(max_entries=1)
+def load_data(version=None):
+    """
+    Load dataset gabungan dari store partisi di disk. `version` (dataset_version())
+    hanya menjadi kunci cache: berubah saat ada file sumber baru atau berubah.
+    Hasilnya satu ReadOnlyDataFrame per proses yang dipakai bersama semua sesi
+    (tanpa salinan per rerun seperti st.cache_data).
+    """
     for file_path in DATASETS:
-        try:
-            df = pd.read_csv(file_path)
-            df = normalize_column_names(df)
-            # Tambahkan kolom untuk tracking sumber dataset
-            df['Dataset_Source'] = file_path.replace('.csv', '').replace('dataset_', '')
-            dfs.append(df)
-        except FileNotFoundError:
+        if not os.path.exists(file_path):
             st.warning(f"File {file_path} tidak ditemukan, dilewati.")
-        except Exception as e:
-            st.warning(f"Error loading {file_path}: {str(e)}")
     
-    if not dfs:
+    try:
+        with _store_lock:
+            manifest = sync_store(source_files())
+    except OSError:
+        # Store tidak bisa ditulis (mis. read-only): bangun di memori saja
+        return freeze_frame(build_combined_data(source_files()))
+    
+    partitions = manifest['partitions']
+    if not partitions:
         st.error("Tidak ada dataset yang berhasil dimuat!")
-        return pd.DataFrame()
+        return freeze_frame(pd.DataFrame())
+    # Partisi dibaca dari disk (bukan cache memori) agar data hanya ada sekali di memori dan
+    # tidak ada salinan lama: partisi yang bergantung pada file yang berubah ditulis ulang
+    frames = [read_partition(p) for p in partitions]
+    return freeze_frame(combine_partitions(frames, partitions))
+
+
+def sync_store(file_paths, store_dir=DATA_STORE_DIR):
+    """
+    Samakan store dengan daftar file sumber. Partisi dicocokkan ke file lewat path sumber
+    (bukan posisi), sehingga file baru yang namanya terurut lebih awal tidak membuat file
+    yang sudah di-ingest dibaca ulang. Urutan partisi mengikuti urutan ingest di manifest;
+    file baru di-ingest di akhir dan dideduplikasi terhadap hash partisi yang ada.
+    Partisi file yang berubah/hilang dibuang, begitu juga partisi yang membuang baris
+    sebagai duplikat dari partisi itu (baris tersebut harus kembali); file yang masih ada
+    di antaranya di-ingest ulang di akhir.
+    """
+    manifest = load_manifest(store_dir)
+    wanted = set(file_paths)
+    kept, dropped = [], []
+    dropped_sources = set()
+    for partition in manifest['partitions']:
+        depends_on_dropped = dropped_sources.intersection(partition['duplicates'])
+        if partition['path'] in wanted and not depends_on_dropped and partition_is_current(partition, partition['path']):
+            kept.append(partition)
+        else:
+            dropped.append(partition)
+            dropped_sources.add(partition['report']['Sumber'])
     
-    # Gabungkan semua dataset
-    combined_df = pd.concat(dfs, ignore_index=True)
+    # Partisi yang dibangun ulang tetap berurutan seperti sebelumnya, lalu file baru
+    rebuild = [p['path'] for p in dropped if p['path'] in wanted]
+    ingested = {p['path'] for p in kept}.union(rebuild)
+    new_paths = rebuild + [path for path in file_paths if path not in ingested]
     
-    # Hapus duplikat jika ada (berdasarkan kolom utama)
-    key_columns = [c for c in ['Sex', 'Age', 'Birth_Weight', 'Birth_Length', 'Body_Weight', 'Body_Length', 'Stunting'] if c in combined_df.columns]
-    if key_columns:
-        combined_df = combined_df.drop_duplicates(subset=key_columns, keep='first')
+    if dropped or new_paths:
+        remove_partitions(dropped, store_dir)
+        partitions = kept
+        dedup_index = DedupIndex()
+        for partition in partitions:
+            dedup_index.add(read_partition_hashes(partition, store_dir), partition['report']['Sumber'])
+        for path, df, hashes, report, duplicates in _ingest_partitions(new_paths, dedup_index):
+            entry = write_partition(len(partitions), path, df, hashes, store_dir)
+            entry.update({'report': report, 'duplicates': duplicates})
+            partitions.append(entry)
+        manifest['partitions'] = partitions
+    save_manifest(manifest, store_dir)
+    return manifest
+
+
+def _ingest_file(file_path):
+    """Worker: baca, normalisasi dan hash satu file. Return (df, hash baris, laporan, warning)"""
+    start = time.perf_counter()
+    df, hashes, warning = None, None, None
+    try:
+        df, engine = read_dataset(file_path)
+        df = normalize_column_names(df)
+        # Tambahkan kolom untuk tracking sumber dataset dan posisi baris di file sumber
+        df['Dataset_Source'] = source_name(file_path)
+        df['Source_Row'] = np.arange(len(df), dtype=np.int32)
+        hashes = row_hashes(df)
+    except FileNotFoundError:
+        engine = None
+        warning = f"File {file_path} tidak ditemukan, dilewati."
+    except Exception as e:
+        engine = None
+        warning = f"Error loading {file_path}: {str(e)}"
+    report = {
+        'Sumber': source_name(file_path),
+        'Baris': 0 if df is None else int(len(df)),
+        'Waktu (s)': round(time.perf_counter() - start, 4),
+        'Engine': engine or '-',
+    }
+    return df, hashes, report, warning
+
+
+def _ingest_partitions(file_paths, dedup_index):
+    """
+    Baca file secara paralel, lalu deduplikasi berurutan terhadap dedup_index
+    (= drop_duplicates(keep='first') atas gabungan). Yield per file yang berhasil:
+    (path, df partisi, hash baris yang dipertahankan, laporan, {sumber asal: jumlah duplikat}).
+    """
+    results = []
+    if file_paths:
+        with ThreadPoolExecutor(max_workers=min(len(file_paths), INGEST_MAX_WORKERS)) as executor:
+            results = list(executor.map(_ingest_file, file_paths))
     
+    # st.warning hanya dipanggil di thread utama (worker tidak punya konteks Streamlit)
+    for path, (df, hashes, report, warning) in zip(file_paths, results):
+        if warning:
+            st.warning(warning)
+        if df is None:
+            continue
+        source = report['Sumber']
+        before = dedup_index.duplicate_matrix().get(source)
+        keep = dedup_index.add(hashes, source)
+        after = dedup_index.duplicate_matrix()[source]
+        if before is not None:
+            after = after.sub(before, fill_value=0)
+        duplicates = {kept_source: int(count) for kept_source, count in after.items() if count}
+        yield path, optimize_dtypes(df[keep].reset_index(drop=True)), hashes[keep], report, duplicates
+
+
+def build_combined_data(file_paths):
+    """Baca, normalisasi dan gabungkan file CSV sumber di memori (tanpa store)"""
+    frames, partitions = [], []
+    for path, df, _, report, duplicates in _ingest_partitions(file_paths, DedupIndex()):
+        frames.append(df)
+        partitions.append({'report': report, 'duplicates': duplicates})
+    if not frames:
+        st.error("Tidak ada dataset yang berhasil dimuat!")
+        return pd.DataFrame()
+    return combine_partitions(frames, partitions)
+
+
+def combine_partitions(frames, partitions):
+    """Gabungkan partisi menjadi satu DataFrame + laporan ingest dan matriks duplikat di attrs"""
+    combined_df = optimize_dtypes(pd.concat(frames, ignore_index=True))
+    combined_df.attrs['ingest_report'] = [p['report'] for p in partitions]
+    sources = [p['report']['Sumber'] for p in partitions]
+    counts = [[0] * len(sources) for _ in sources]
+    for column, partition in enumerate(partitions):
+        for kept_source, count in partition['duplicates'].items():
+            counts[sources.index(kept_source)][column] += count
+    combined_df.attrs['duplicate_matrix'] = {'sources': sources, 'counts': counts}
     return combined_df
 
 
+def duplicate_matrix(df):
+    """Matriks duplikat per sumber dari df.attrs (baris = sumber dipertahankan, kolom = sumber duplikat)"""
+    matrix = df.attrs.get('duplicate_matrix')
+    if not matrix:
+        return None
+    return pd.DataFrame(matrix['counts'], index=matrix['sources'], columns=matrix['sources'])
+
+
+def source_name(file_path):
+    """Nama sumber dataset (nilai kolom Dataset_Source) dari path file"""
+    return file_path.replace('.csv', '').replace('dataset_', '')
+
+
+def read_dataset(file_path):
+    """
+    Baca hanya kolom yang dipakai dashboard (DATASET_COLUMNS) dengan dtype eksplisit.
+    Memakai engine pyarrow jika tersedia. Return (DataFrame, nama engine).
+    """
+    engine = 'pyarrow' if pyarrow_available() else 'c'
+    columns = DATASET_COLUMNS.get(os.path.basename(file_path))
+    if columns is None:
+        return pd.read_csv(file_path, engine=engine), engine
+    # Engine pyarrow tidak menerima usecols callable: ambil dari header dulu
+    header = pd.read_csv(file_path, nrows=0).columns
+    usecols = [c for c in header if c in columns]
+    dtype = {c: columns[c] for c in usecols}
+    return pd.read_csv(file_path, usecols=usecols, dtype=dtype, engine=engine), engine
+
+
+def read_dataset_chunks(file_path, chunksize):
+    """Seperti read_dataset, tetapi per chunk (engine C; pyarrow tidak mendukung chunksize)"""
+    columns = DATASET_COLUMNS.get(os.path.basename(file_path))
+    if columns is None:
+        return pd.read_csv(file_path, chunksize=chunksize)
+    return pd.read_csv(file_path, usecols=lambda c: c in columns, dtype=columns, chunksize=chunksize)
+
+
+@st.cache_data
+def load_extra_columns(file_path, size=None, mtime_ns=None):
+    """
+    Baca kolom file sumber yang tidak dimuat oleh load_data (urutan baris = Source_Row).
+    size dan mtime_ns file hanya menjadi kunci cache: file yang diganti dibaca ulang.
+    """
+    columns = DATASET_COLUMNS.get(os.path.basename(file_path))
+    if columns is None or not os.path.exists(file_path):
+        return pd.DataFrame()
+    return pd.read_csv(file_path, usecols=lambda c: c not in columns)
+
+
+def load_all_columns(df):
+    """Gabungkan kolom sumber lainnya ke df berdasarkan (Dataset_Source, Source_Row)"""
+    if 'Dataset_Source' not in df.columns or 'Source_Row' not in df.columns:
+        return df
+    parts = []
+    for file_path in source_files():
+        mask = (df['Dataset_Source'] == source_name(file_path)).to_numpy()
+        if not mask.any():
+            continue
+        stat = os.stat(file_path)
+        extra = load_extra_columns(file_path, stat.st_size, stat.st_mtime_ns)
+        if extra.empty:
+            continue
+        rows = df['Source_Row'].to_numpy()[mask]
+        parts.append(extra.iloc[rows].set_index(df.index[mask]))
+    if not parts:
+        return df
+    return df.join(pd.concat(parts))
+
+
+def normalize_stunting(stunting_series):
+    """
+    Encode status stunting (numerik maupun string) menjadi kode int8: 1 = stunting,
+    0 = tidak stunting, -1 = label kosong (tidak dihitung di kelas mana pun)
+    """
+    if pd.api.types.is_numeric_dtype(stunting_series):
+        positive = stunting_series == 1 if (stunting_series == 1).any() else stunting_series > 0
+    else:
+        positive = stunting_series.astype(str).str.lower().str.strip().isin(STUNTING_POSITIVE_VALUES)
+    return positive.astype(np.int8).mask(stunting_series.isna(), -1)
+
+
+def optimize_dtypes(df):
+    """
+    Perkecil tipe data: kolom kategori -> category, Stunting -> int8 (+ Stunting_Label),
+    float64 -> float32 jika presisi tetap terjaga, integer -> tipe terkecil.
+    """
+    df = df.copy()
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype('category')
+    if 'Stunting' in df.columns:
+        df['Stunting'] = normalize_stunting(df['Stunting'])
+        df['Stunting_Label'] = stunting_label(df['Stunting'])
+    
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_float_dtype(series) and series.dtype == np.float64:
+            values = series.to_numpy()
+            downcast = values.astype(np.float32)
+            if np.allclose(downcast, values, rtol=1e-6, atol=0, equal_nan=True):
+                df[col] = downcast
+        elif pd.api.types.is_integer_dtype(series) and series.dtype != np.int8:
+            df[col] = pd.to_numeric(series, downcast='integer')
+    return df
+
+
+def memory_report(df):
+    """Laporan penggunaan memori (KB) per kolom dan per sumber dataset"""
+    usage = df.memory_usage(deep=True, index=False)
+    per_column = pd.DataFrame({
+        'Tipe Data': df.dtypes.astype(str),
+        'Memori (KB)': (usage / 1024).round(1)
+    })
+    
+    per_source = None
+    if 'Dataset_Source' in df.columns:
+        rows = []
+        for source, part in df.groupby('Dataset_Source', observed=True):
+            rows.append({
+                'Sumber': source,
+                'Jumlah Data': len(part),
+                'Memori (KB)': round(part.memory_usage(deep=True, index=False).sum() / 1024, 1)
+            })
+        per_source = pd.DataFrame(rows)
+    return per_column, per_source
+
+
 def normalize_column_names(df):
     """Normalisasi nama kolom untuk kompatibilitas antar dataset"""
     df = df.copy()
@@ -62,52 +323,51 @@ def normalize_column_names(df):
     return df
 
 
+def stunting_label(stunting_codes):
+    """Label kategorikal ('Tidak Stunting'/'Stunting') dari kode Stunting int8"""
+    return pd.Categorical.from_codes(stunting_codes.to_numpy(), categories=STUNTING_LABELS)
+
+
 def create_stunting_label(df):
     """Buat label stunting untuk visualisasi"""
-    if 'Stunting' in df.columns:
+    if 'Stunting' in df.columns and 'Stunting_Label' not in df.columns:
         df = df.copy()
-        # Handle baik numerik maupun string
-        if pd.api.types.is_numeric_dtype(df['Stunting']):
-            df['Stunting_Label'] = df['Stunting'].map({0: 'Tidak Stunting', 1: 'Stunting'})
-        else:
-            # Handle string values
-            stunting_lower = df['Stunting'].astype(str).str.lower().str.strip()
-            positive_values = ['yes', 'stunting', '1', 'true', 'y']
-            df['Stunting_Label'] = stunting_lower.apply(
-                lambda x: 'Stunting' if x in positive_values else 'Tidak Stunting'
-            )
+        if df['Stunting'].dtype != np.int8:
+            df['Stunting'] = normalize_stunting(df['Stunting'])
+        df['Stunting_Label'] = stunting_label(df['Stunting'])
     return df
 
 
 def create_crosstab_melted(df, index_col, value_col='Stunting'):
-    """Helper untuk membuat crosstab yang sudah di-melt"""
-    # Filter NaN sebelum membuat crosstab
-    df_clean = df[[index_col, value_col]].dropna()
-    crosstab = pd.crosstab(df_clean[index_col], df_clean[value_col])
-    crosstab_reset = crosstab.reset_index()
+    """Helper untuk membuat crosstab yang sudah di-melt (bincount atas kode kategori x kode Stunting)"""
+    stunting = df[value_col]
+    if stunting.dtype != np.int8:
+        stunting = normalize_stunting(stunting)
     
-    # Tentukan value_vars berdasarkan tipe data
-    if pd.api.types.is_numeric_dtype(df_clean[value_col]):
-        value_vars = [0, 1]
-        label_map = {0: 'Tidak Stunting', 1: 'Stunting'}
+    # Kode kategori: -1 untuk NaN, dibuang seperti dropna sebelumnya
+    if isinstance(df[index_col].dtype, pd.CategoricalDtype):
+        codes = df[index_col].cat.codes.to_numpy()
+        categories = df[index_col].cat.categories
     else:
-        # Ambil unique values dari kolom (sudah difilter NaN)
-        unique_values = [val for val in df_clean[value_col].unique() if pd.notna(val) and str(val).strip() != '']
-        value_vars = list(unique_values)
-        # Buat label map untuk string values
-        positive_values = ['yes', 'stunting', '1', 'true', 'y']
-        label_map = {
-            val: 'Stunting' if str(val).lower().strip() in positive_values else 'Tidak Stunting'
-            for val in unique_values
-        }
-    
-    melted = pd.melt(
-        crosstab_reset,
-        id_vars=[index_col],
-        value_vars=value_vars,
-        var_name=value_col,
-        value_name='Jumlah'
-    )
-    melted['Stunting_Label'] = melted[value_col].map(label_map)
-    return melted
+        codes, categories = pd.factorize(df[index_col], sort=True)
+    # Baris tanpa label Stunting (kode -1) juga dibuang
+    valid = (codes >= 0) & (stunting.to_numpy() >= 0)
+    counts = np.bincount(
+        codes[valid].astype(np.int64) * 2 + stunting.to_numpy()[valid],
+        minlength=2 * len(categories)
+    ).reshape(len(categories), 2)
+    return melt_stunting_counts(categories, counts, index_col, value_col)
+
 
+def melt_stunting_counts(categories, counts, index_col, value_col='Stunting'):
+    """Matriks jumlah (kategori x kode Stunting 0/1) -> format melt untuk bar chart"""
+    # Hanya kategori dan status yang muncul di data (seperti crosstab)
+    present_rows = np.flatnonzero(counts.sum(axis=1))
+    present_cols = [code for code in (0, 1) if counts[:, code].any()]
+    melted = pd.DataFrame({
+        index_col: np.tile(np.asarray(categories)[present_rows], len(present_cols)),
+        value_col: np.repeat(np.array(present_cols, dtype=np.int8), len(present_rows)),
+        'Jumlah': np.concatenate([counts[present_rows, code] for code in present_cols]) if present_cols else np.array([], dtype=np.int64)
+    })
+    melted['Stunting_Label'] = stunting_label(melted[value_col])
+    return melted
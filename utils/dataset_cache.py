@@ -0,0 +1,189 @@
+"""Store partisi kolumnar di disk untuk dataset gabungan (Parquet, fallback npz)
+
+Setiap file sumber (DATASETS lalu file CSV di INGEST_DIR) menjadi satu partisi
+berisi baris yang sudah dinormalisasi dan dideduplikasi terhadap partisi
+sebelumnya, ditambah array hash barisnya. manifest.json mencatat urutan partisi
+beserta ukuran, mtime dan hash file sumbernya.
+"""
+import glob
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from constants import DATASETS, DATA_CACHE_VERSION, DATA_STORE_DIR, INGEST_DIR
+from utils.file_utils import file_sha256
+
+STORE_MANIFEST = 'manifest.json'
+
+
+def pyarrow_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def source_files(datasets=DATASETS, ingest_dir=INGEST_DIR):
+    """
+    File sumber yang ada: DATASETS lalu CSV di ingest_dir (urut nama). Store mencocokkan
+    partisi ke file lewat path, jadi urutan ini hanya menentukan urutan ingest file baru.
+    """
+    files = [path for path in datasets if os.path.exists(path)]
+    if os.path.isdir(ingest_dir):
+        files.extend(sorted(glob.glob(os.path.join(ingest_dir, '*.csv'))))
+    return files
+
+
+def dataset_version(file_paths=None):
+    """Versi murah dataset dari nama, ukuran dan mtime file sumber (tanpa membaca isi)"""
+    if file_paths is None:
+        file_paths = source_files()
+    entries = []
+    for path in file_paths:
+        stat = os.stat(path)
+        entries.append([path, stat.st_size, stat.st_mtime_ns])
+    payload = json.dumps({'version': DATA_CACHE_VERSION, 'sources': entries})
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def load_manifest(store_dir=DATA_STORE_DIR):
+    """Manifest store; kosong jika belum ada atau versi format berbeda"""
+    try:
+        with open(os.path.join(store_dir, STORE_MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = None
+    if not manifest or manifest.get('version') != DATA_CACHE_VERSION:
+        return {'version': DATA_CACHE_VERSION, 'partitions': []}
+    return manifest
+
+
+def save_manifest(manifest, store_dir=DATA_STORE_DIR):
+    os.makedirs(store_dir, exist_ok=True)
+    path = os.path.join(store_dir, STORE_MANIFEST)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def partition_is_current(partition, path):
+    """
+    True jika partisi masih mewakili isi file `path`. Hash hanya dihitung ulang
+    jika ukuran/mtime berubah; jika isi sama (file hanya di-touch), mtime di manifest diperbarui.
+    """
+    if partition['path'] != path or not os.path.exists(path):
+        return False
+    stat = os.stat(path)
+    if partition['size'] == stat.st_size and partition['mtime_ns'] == stat.st_mtime_ns:
+        return True
+    if partition['size'] != stat.st_size or file_sha256(path) != partition['sha256']:
+        return False
+    partition['mtime_ns'] = stat.st_mtime_ns
+    return True
+
+
+def _write_npz(path, df):
+    """Fallback tanpa pyarrow: simpan setiap kolom sebagai array NumPy (+ df.attrs dalam JSON)"""
+    arrays = {}
+    meta = []
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            arrays[f'c{i}'] = series.cat.codes.to_numpy()
+            arrays[f'k{i}'] = np.asarray(series.cat.categories.astype(str), dtype=str)
+            meta.append([col, 'category'])
+        elif pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            arrays[f'c{i}'] = series.to_numpy()
+            meta.append([col, str(series.dtype)])
+        else:
+            # Kolom string: simpan teks + mask nilai kosong
+            arrays[f'c{i}'] = np.asarray(series.astype(str), dtype=str)
+            arrays[f'n{i}'] = series.isna().to_numpy()
+            meta.append([col, 'object'])
+    arrays['meta'] = np.array(json.dumps(meta))
+    arrays['attrs'] = np.array(json.dumps(df.attrs))
+    np.savez(path, **arrays)
+
+
+def _read_npz(path):
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data['meta']))
+        columns = {}
+        for i, (col, dtype) in enumerate(meta):
+            if dtype == 'category':
+                columns[col] = pd.Categorical.from_codes(data[f'c{i}'], categories=data[f'k{i}'].tolist())
+            elif dtype == 'object':
+                values = data[f'c{i}'].astype(object)
+                values[data[f'n{i}']] = np.nan
+                columns[col] = values
+            else:
+                columns[col] = data[f'c{i}']
+        df = pd.DataFrame(columns)
+        if 'attrs' in data:
+            df.attrs.update(json.loads(str(data['attrs'])))
+        return df
+
+
+def write_frame(path, df):
+    """Tulis DataFrame secara atomik (.parquet atau .npz sesuai ekstensi path)"""
+    tmp_path = path + '.tmp'
+    if path.endswith('.parquet'):
+        df.to_parquet(tmp_path, index=False)
+    else:
+        _write_npz(tmp_path, df)
+        # np.savez menambahkan .npz jika nama file tidak berakhiran .npz
+        tmp_path = tmp_path if os.path.exists(tmp_path) else tmp_path + '.npz'
+    os.replace(tmp_path, path)
+
+
+def read_frame(path):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return _read_npz(path)
+
+
+def write_partition(index, source_path, df, hashes, store_dir=DATA_STORE_DIR):
+    """
+    Simpan satu partisi (data + hash baris); return entri manifest. Nama file memuat hash
+    sumber dan hash isi partisi (hash baris yang disimpan): jika partisi dibangun ulang
+    karena dedup terhadap partisi sebelumnya berubah, namanya ikut berubah walaupun file
+    sumbernya sama, sehingga tidak ada cache per nama file yang menyajikan isi lama.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    stat = os.stat(source_path)
+    sha256 = file_sha256(source_path)
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    content = hashlib.sha256(hashes.tobytes()).hexdigest()
+    name = f"part-{index:05d}-{sha256[:12]}-{content[:12]}"
+    data_file = name + ('.parquet' if pyarrow_available() else '.npz')
+    write_frame(os.path.join(store_dir, data_file), df)
+    np.save(os.path.join(store_dir, name + '.hashes.npy'), hashes)
+    return {
+        'path': source_path,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': sha256,
+        'content_sha256': content,
+        'data': data_file,
+        'hashes': name + '.hashes.npy',
+        'rows': int(len(df)),
+    }
+
+
+def read_partition(partition, store_dir=DATA_STORE_DIR):
+    return read_frame(os.path.join(store_dir, partition['data']))
+
+
+def read_partition_hashes(partition, store_dir=DATA_STORE_DIR):
+    return np.load(os.path.join(store_dir, partition['hashes']))
+
+
+def remove_partitions(partitions, store_dir=DATA_STORE_DIR):
+    for partition in partitions:
+        for key in ('data', 'hashes'):
+            try:
+                os.remove(os.path.join(store_dir, partition[key]))
+            except OSError:
+                pass
@@ -0,0 +1,113 @@
+"""Deduplikasi berbasis hash 64-bit per baris, bisa dijalankan bertahap per file"""
+import numpy as np
+import pandas as pd
+
+# Kolom utama penentu duplikat
+KEY_COLUMNS = ['Sex', 'Age', 'Birth_Weight', 'Birth_Length', 'Body_Weight', 'Body_Length', 'Stunting']
+
+
+def _hash_values(series):
+    """Hash nilai string/category: hash tiap nilai unik sekali, lalu ambil per baris via kode"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series)
+    # Posisi terakhir = hash untuk nilai kosong (kode -1)
+    values = np.append(np.asarray(uniques, dtype=object), None)
+    return pd.util.hash_array(values)[codes]
+
+
+def row_hashes(df, key_columns=KEY_COLUMNS):
+    """
+    Hash uint64 per baris dari kolom kunci yang ada di df.
+    Numerik selalu di-cast ke float64 (dan -0.0 -> 0.0) agar hash sama antar file
+    dengan dtype berbeda; string/category di-hash berdasarkan nilainya.
+    """
+    columns = {}
+    for col in key_columns:
+        if col not in df.columns:
+            continue
+        series = df[col]
+        if pd.api.types.is_numeric_dtype(series):
+            columns[col] = series.to_numpy(dtype=np.float64) + 0.0
+        else:
+            columns[col] = _hash_values(series)
+    if not columns:
+        return np.arange(len(df), dtype=np.uint64)
+    keys = pd.DataFrame(columns)
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+def _merge_runs(left, right):
+    """Gabungkan dua run terurut (hashes, source_codes) dalam O(n) dengan searchsorted + insert"""
+    positions = np.searchsorted(left[0], right[0])
+    return np.insert(left[0], positions, right[0]), np.insert(left[1], positions, right[1])
+
+
+class DedupIndex:
+    """
+    Himpunan hash baris yang sudah dipertahankan beserta sumbernya, disimpan sebagai
+    beberapa run terurut. Run baru digabung dengan run sebelumnya selama ukurannya sudah
+    sebanding (pemadatan geometris), sehingga jumlah run O(log N) dan total biaya
+    penggabungan O(N log N) walaupun data ditambahkan dalam banyak chunk kecil.
+    Setiap file ditambahkan berurutan; hasilnya sama dengan drop_duplicates(keep='first')
+    atas gabungan semua file. Tabrakan hash 64-bit diabaikan.
+    """
+
+    def __init__(self):
+        # List (hashes uint64 terurut, source_codes int16); run terbesar di depan
+        self.runs = []
+        self.sources = []
+        self.counts = np.zeros((0, 0), dtype=np.int64)
+
+    def __len__(self):
+        return sum(len(run[0]) for run in self.runs)
+
+    def _source_code(self, source):
+        if source not in self.sources:
+            self.sources.append(source)
+            grown = np.zeros((len(self.sources), len(self.sources)), dtype=np.int64)
+            grown[:self.counts.shape[0], :self.counts.shape[1]] = self.counts
+            self.counts = grown
+        return self.sources.index(source)
+
+    def _lookup(self, hashes):
+        """(mask hash yang sudah ada, kode sumber pemiliknya untuk yang ada)"""
+        # Hash dicari dalam urutan terurut: searchsorted jauh lebih cepat untuk kunci terurut
+        order = np.argsort(hashes)
+        sorted_hashes = hashes[order]
+        seen = np.zeros(len(hashes), dtype=bool)
+        owners = np.full(len(hashes), -1, dtype=np.int16)
+        for run_hashes, run_codes in self.runs:
+            pos = np.minimum(np.searchsorted(run_hashes, sorted_hashes), len(run_hashes) - 1)
+            found = run_hashes[pos] == sorted_hashes
+            seen[order[found]] = True
+            owners[order[found]] = run_codes[pos[found]]
+        return seen, owners
+
+    def add(self, hashes, source):
+        """Tambahkan hash baris satu file; return mask baris yang dipertahankan (bukan duplikat)"""
+        code = self._source_code(source)
+        hashes = np.asarray(hashes, dtype=np.uint64)
+
+        # Duplikat dari baris yang sudah ada sebelumnya
+        seen, owners = self._lookup(hashes)
+        np.add.at(self.counts[:, code], owners[seen], 1)
+
+        # Duplikat di dalam file itu sendiri: pertahankan kemunculan pertama (hash-set)
+        keep = ~seen
+        keep[keep] = ~pd.Index(hashes[keep]).duplicated(keep='first')
+        self.counts[code, code] += int((~seen).sum() - keep.sum())
+
+        # Run baru; gabungkan dengan run sebelumnya selama run itu tidak lebih dari 2x lebih besar
+        unique_hashes = np.sort(hashes[keep])
+        if len(unique_hashes):
+            self.runs.append((unique_hashes, np.full(len(unique_hashes), code, dtype=np.int16)))
+        while len(self.runs) > 1 and len(self.runs[-2][0]) <= 2 * len(self.runs[-1][0]):
+            right = self.runs.pop()
+            self.runs[-1] = _merge_runs(self.runs[-1], right)
+        return keep
+
+    def duplicate_matrix(self):
+        """DataFrame jumlah duplikat: baris = sumber yang dipertahankan, kolom = sumber duplikat"""
+        return pd.DataFrame(self.counts, index=self.sources, columns=self.sources)
@@ -0,0 +1,159 @@
+"""Mesin fitur kolumnar untuk 54 fitur turunan model stunting"""
+import numpy as np
+
+FEATURE_NAMES = [
+    'Sex_Encoded', 'ASI_Eksklusif_Encoded', 'Age', 'Birth_Weight', 'Birth_Length',
+    'Body_Weight', 'Body_Length', 'BMI', 'Weight_Growth', 'Length_Growth',
+    'Weight_Growth_Rate', 'Length_Growth_Rate', 'Weight_per_Age', 'Length_per_Age',
+    'Low_Birth_Weight', 'Very_Low_Birth_Weight', 'Short_Birth_Length', 'Birth_Weight_Category',
+    'Length_for_Age_Z_Score', 'Weight_for_Age_Z_Score', 'Weight_for_Length_Z_Score',
+    'Stunting_WHO_Indicator', 'Severe_Stunting', 'Underweight', 'Wasting', 'Overweight',
+    'ASI_Weight_Growth', 'ASI_Length_Growth', 'ASI_Weight_Growth_Rate',
+    'Sex_Weight_Growth', 'Sex_Length_Growth', 'LBW_Weight_Growth', 'LBW_Length_Growth',
+    'Nutritional_Stress', 'Weight_Velocity', 'Length_Velocity', 'Catch_Up_Growth',
+    'Log_Body_Weight', 'Log_Body_Length', 'Log_Birth_Weight', 'Log_Birth_Length', 'Log_BMI',
+    'Age_Category_WHO', 'Age_Years', 'Weight_Ratio_to_Birth', 'Length_Ratio_to_Birth',
+    'BMI_to_Age_Ratio', 'Age_Squared', 'BMI_Squared', 'Weight_Growth_Squared',
+    'Weight_Percentile', 'Length_Percentile', 'BMI_Percentile', 'Length_Z_Score_Percentile',
+]
+
+N_FEATURES = len(FEATURE_NAMES)
+
+RAW_COLUMNS = ['Sex', 'Age', 'Birth_Weight', 'Birth_Length', 'Body_Weight', 'Body_Length', 'ASI_Eksklusif']
+
+
+def _safe_div(num, den, where=None):
+    """Pembagian elementwise, bernilai 0 jika penyebut <= 0 (atau `where` False)"""
+    out = np.zeros(np.broadcast(num, den).shape, dtype=np.float64)
+    np.divide(num, den, out=out, where=den > 0 if where is None else where)
+    return out
+
+
+def _safe_log1p(x):
+    """log(x + 1) elementwise, bernilai 0 jika x <= 0"""
+    out = np.zeros_like(x)
+    np.log(x + 1, out=out, where=x > 0)
+    return out
+
+
+def _percentile(z):
+    """Estimasi persentil dari Z-score, dibatasi ke [0, 100]"""
+    return np.clip((z + 3) / 6 * 100, 0, 100)
+
+
+def compute_feature_matrix(sex, age, birth_weight, birth_length, body_weight, body_length, asi, dtype=np.float32):
+    """
+    Hitung 54 fitur untuk banyak anak sekaligus.
+    Setiap argumen berupa array (atau skalar) dengan panjang sama; hasilnya
+    matriks C-contiguous berukuran (n, 54) dengan urutan FEATURE_NAMES. Perhitungan
+    selalu float64; `dtype` hanya tipe hasil (float32 untuk inferensi, float64 untuk fit scaler).
+    """
+    sex = np.atleast_1d(np.asarray(sex, dtype=object))
+    asi = np.atleast_1d(np.asarray(asi, dtype=object))
+    age = np.atleast_1d(np.asarray(age, dtype=np.float64))
+    birth_weight = np.atleast_1d(np.asarray(birth_weight, dtype=np.float64))
+    birth_length = np.atleast_1d(np.asarray(birth_length, dtype=np.float64))
+    body_weight = np.atleast_1d(np.asarray(body_weight, dtype=np.float64))
+    body_length = np.atleast_1d(np.asarray(body_length, dtype=np.float64))
+
+    out = np.empty((len(age), N_FEATURES), dtype=dtype)
+
+    # Encoded features
+    sex_encoded = (sex == "Male").astype(np.float64)
+    asi_encoded = (asi == "Yes").astype(np.float64)
+
+    # Derived features
+    bmi = _safe_div(body_weight, (body_length / 100.0) ** 2, where=body_length > 0)
+    weight_growth = body_weight - birth_weight
+    length_growth = body_length - birth_length
+    weight_growth_rate = _safe_div(weight_growth, age)
+    length_growth_rate = _safe_div(length_growth, age)
+
+    # Binary indicators
+    low_birth_weight = (birth_weight < 2.5).astype(np.float64)
+
+    # Z-scores (simplified)
+    expected_length = np.where(age <= 24, 49 + age * 2.5, 49 + 24 * 2.5 + (age - 24) * 0.5)
+    length_z_score = (body_length - expected_length) / 3.0
+    expected_weight = np.where(age <= 12, 3.2 + age * 0.4, 3.2 + 12 * 0.4 + (age - 12) * 0.2)
+    weight_z_score = (body_weight - expected_weight) / 1.5
+    wfl_z_score = (body_weight - (body_length / 100) * 15) / 1.5
+
+    out[:, 0] = sex_encoded
+    out[:, 1] = asi_encoded
+    out[:, 2] = age
+    out[:, 3] = birth_weight
+    out[:, 4] = birth_length
+    out[:, 5] = body_weight
+    out[:, 6] = body_length
+    out[:, 7] = bmi
+    out[:, 8] = weight_growth
+    out[:, 9] = length_growth
+    out[:, 10] = weight_growth_rate
+    out[:, 11] = length_growth_rate
+    out[:, 12] = _safe_div(body_weight, age)
+    out[:, 13] = _safe_div(body_length, age)
+    out[:, 14] = low_birth_weight
+    out[:, 15] = birth_weight < 1.5
+    out[:, 16] = birth_length < 48.0
+    # Birth weight category (0=very low, 1=low, 2=normal, 3=high)
+    out[:, 17] = np.searchsorted([1.5, 2.5, 4.0], birth_weight, side='right')
+    out[:, 18] = length_z_score
+    out[:, 19] = weight_z_score
+    out[:, 20] = wfl_z_score
+
+    # WHO indicators
+    out[:, 21] = length_z_score < -2
+    out[:, 22] = length_z_score < -3
+    out[:, 23] = weight_z_score < -2
+    out[:, 24] = wfl_z_score < -2
+    out[:, 25] = wfl_z_score > 2
+
+    # Interaction features
+    out[:, 26] = weight_growth * asi_encoded
+    out[:, 27] = length_growth * asi_encoded
+    out[:, 28] = weight_growth_rate * asi_encoded
+    out[:, 29] = weight_growth * sex_encoded
+    out[:, 30] = length_growth * sex_encoded
+    out[:, 31] = weight_growth * low_birth_weight
+    out[:, 32] = length_growth * low_birth_weight
+
+    # Nutritional stress
+    out[:, 33] = np.maximum(0, -weight_z_score) * np.maximum(0, -length_z_score)
+
+    # Velocity features
+    out[:, 34] = weight_growth_rate
+    out[:, 35] = length_growth_rate
+    out[:, 36] = (low_birth_weight == 1) & (weight_growth > age * 0.5)
+
+    # Log transformations
+    out[:, 37] = _safe_log1p(body_weight)
+    out[:, 38] = _safe_log1p(body_length)
+    out[:, 39] = _safe_log1p(birth_weight)
+    out[:, 40] = _safe_log1p(birth_length)
+    out[:, 41] = _safe_log1p(bmi)
+
+    # Age category WHO (0=0-6, 1=6-12, 2=12-24, 3=24-60)
+    out[:, 42] = np.searchsorted([6, 12, 24], age, side='left')
+
+    # Additional derived features
+    out[:, 43] = age / 12.0
+    out[:, 44] = _safe_div(body_weight, birth_weight)
+    out[:, 45] = _safe_div(body_length, birth_length)
+    out[:, 46] = _safe_div(bmi, age)
+    out[:, 47] = age ** 2
+    out[:, 48] = bmi ** 2
+    out[:, 49] = weight_growth ** 2
+
+    # Percentile features (estimasi berdasarkan Z-score)
+    out[:, 50] = _percentile(weight_z_score)
+    out[:, 51] = _percentile(length_z_score)
+    out[:, 52] = _percentile(wfl_z_score)
+    out[:, 53] = out[:, 51]
+
+    return out
+
+
+def compute_features_from_frame(df, dtype=np.float32):
+    """Hitung matriks fitur dari DataFrame dengan kolom RAW_COLUMNS"""
+    return compute_feature_matrix(*(df[col].to_numpy() for col in RAW_COLUMNS), dtype=dtype)
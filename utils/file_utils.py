@@ -0,0 +1,11 @@
+"""Fungsi bantu untuk informasi file"""
+import hashlib
+
+
+def file_sha256(path, block_size=1 << 20):
+    """Hitung SHA-256 isi file per blok"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,173 @@
+"""Indeks bitmap untuk filter sidebar dan tampilan baris terpilih (DataView)"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.group_stats import GroupCodes
+from utils.result_cache import estimate_nbytes
+from utils.shared_frame import read_only_view
+
+# Field FilterState -> kolom kategorikal yang punya bitmap per nilai
+BITMAP_COLUMNS = {'sex': 'Sex', 'asi': 'ASI_Eksklusif', 'stunting': 'Stunting'}
+
+
+def _pack(mask):
+    """Mask bool -> bitmap uint64 (1 bit per baris, sisa bit di akhir bernilai 0)"""
+    words = (len(mask) + 63) // 64
+    packed = np.zeros(words * 8, dtype=np.uint8)
+    bits = np.packbits(mask, bitorder='little')
+    packed[:len(bits)] = bits
+    return packed.view(np.uint64)
+
+
+def _unpack(bitmap, n):
+    return np.unpackbits(bitmap.view(np.uint8), count=n, bitorder='little').view(bool)
+
+
+class FilterIndex:
+    """
+    Dibangun sekali per dataset: bitmap per nilai untuk Sex, ASI_Eksklusif dan Stunting,
+    serta urutan baris berdasarkan Age (NaN di akhir) untuk rentang umur via searchsorted.
+    resolve(state) menghasilkan array indeks baris yang lolos semua filter.
+    """
+
+    def __init__(self, df):
+        self.n_rows = len(df)
+        self.bitmaps = {}
+        for field, col in BITMAP_COLUMNS.items():
+            if col not in df.columns:
+                continue
+            series = df[col]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes, values = series.cat.codes.to_numpy(), series.cat.categories
+            else:
+                codes, values = pd.factorize(series, sort=True)
+            self.bitmaps[field] = {value: _pack(codes == code) for code, value in enumerate(values)}
+        
+        self.age_order = None
+        if 'Age' in df.columns:
+            age = df['Age'].to_numpy()
+            order_dtype = np.int32 if self.n_rows < 2 ** 31 else np.int64
+            self.age_order = np.argsort(age, kind='stable').astype(order_dtype)
+            sorted_age = age[self.age_order]
+            # NaN diurutkan ke akhir dan tidak pernah lolos filter umur
+            self.age_sorted = sorted_age[:np.count_nonzero(~np.isnan(sorted_age))]
+        self.all_rows = _pack(np.ones(self.n_rows, dtype=bool))
+
+    def _value_bitmap(self, field, selected):
+        """OR bitmap semua nilai terpilih; nilai yang tidak ada di data diabaikan"""
+        result = np.zeros_like(self.all_rows)
+        for value in selected:
+            bitmap = self.bitmaps[field].get(value)
+            if bitmap is not None:
+                result |= bitmap
+        return result
+
+    def age_rows(self, age_range):
+        """Indeks baris (belum terurut) dengan age_range[0] <= Age <= age_range[1]"""
+        start = np.searchsorted(self.age_sorted, age_range[0], side='left')
+        stop = np.searchsorted(self.age_sorted, age_range[1], side='right')
+        return self.age_order[start:stop]
+
+    def resolve(self, state):
+        """Array indeks baris (int64, terurut) yang lolos FilterState"""
+        bitmap = self.all_rows.copy()
+        for field in BITMAP_COLUMNS:
+            selected = getattr(state, field)
+            if selected is not None and field in self.bitmaps:
+                bitmap &= self._value_bitmap(field, selected)
+        mask = _unpack(bitmap, self.n_rows)
+        if state.age_range is not None and self.age_order is not None:
+            in_range = np.zeros(self.n_rows, dtype=bool)
+            in_range[self.age_rows(state.age_range)] = True
+            mask &= in_range
+        return np.flatnonzero(mask)
+
+
+@st.cache_resource(max_entries=1)
+def load_filter_index(_df, version=None):
+    """
+    FilterIndex untuk dataset hasil load_data(version), dibagi ke semua sesi. Frame diterima
+    dari pemanggil (tidak di-hash, kunci cache = version) agar load_data tidak dipanggil
+    ulang dan peringatannya tidak diputar ulang setiap cache hit.
+    """
+    return FilterIndex(_df)
+
+
+class DataView:
+    """
+    Baris terpilih (array indeks) atas DataFrame bersama tanpa menyalin seluruh frame.
+    Kolom diambil saat dipakai: view['Age'] memberi Series baris terpilih, frame(kolom)
+    memberi DataFrame read-only hanya untuk kolom yang dibutuhkan halaman. Kolom, frame
+    dan agregat turunan (cached) disimpan di view sehingga bisa dipakai ulang lewat ResultCache.
+    Baris baru di-resolve saat pertama dipakai; halaman yang cukup dengan cube tidak memicunya.
+    """
+
+    def __init__(self, df, rows, cube=None, groups=None):
+        self.df = df
+        # Array indeks, atau fungsi tanpa argumen yang baru dipanggil saat baris dibutuhkan
+        self._rows = rows
+        # Cube sel yang sudah difilter (None jika tidak ada): cukup untuk metrik dan tabel jumlah
+        self.cube = cube
+        # GroupCodes dataset penuh (dihitung saat load); dibangun dari df jika tidak diberikan
+        self.groups = groups
+        self._columns = {}
+        self._results = {}
+
+    @property
+    def rows(self):
+        if callable(self._rows):
+            self._rows = self._rows()
+        return self._rows
+
+    @property
+    def columns(self):
+        return self.df.columns
+
+    @property
+    def attrs(self):
+        return self.df.attrs
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _selects_all(self):
+        return len(self.rows) == len(self.df)
+
+    def __getitem__(self, key):
+        if not isinstance(key, str):
+            return self.frame(list(key))
+        # Semua baris terpilih: kolom df bersama dipakai langsung tanpa disimpan
+        if self._selects_all():
+            return self.df[key]
+        if key not in self._columns:
+            self._columns[key] = self.df[key].take(self.rows)
+        return self._columns[key]
+
+    def group_codes(self, name):
+        """(kode kelompok baris terpilih, label) untuk grouped_stats"""
+        if self.groups is None:
+            self.groups = GroupCodes(self.df)
+        codes = self.groups.codes[name]
+        if self._selects_all():
+            return codes, self.groups.labels[name]
+        return self.cached(('codes', name), codes.take, self.rows), self.groups.labels[name]
+
+    def frame(self, columns=None):
+        """DataFrame read-only berisi baris terpilih (semua kolom jika columns None)"""
+        df = self.df if columns is None else self.df[list(columns)]
+        if self._selects_all():
+            return read_only_view(df)
+        key = ('frame', None if columns is None else tuple(columns))
+        return self.cached(key, lambda: read_only_view(df.take(self.rows)))
+
+    def cached(self, key, func, *args):
+        """Hasil func(*args) untuk baris ini, dihitung sekali per view (key harus hashable)"""
+        if key not in self._results:
+            self._results[key] = func(*args)
+        return self._results[key]
+
+    def nbytes(self):
+        """Perkiraan memori array baris, kolom dan hasil yang disimpan view ini"""
+        rows = 0 if callable(self._rows) else self._rows.nbytes
+        cube = estimate_nbytes(self.cube) if self.cube is not None else 0
+        return rows + cube + estimate_nbytes(self._columns) + estimate_nbytes(self._results)
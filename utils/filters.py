@@ -1,126 +1,197 @@
 """Fungsi untuk filter sidebar"""
+from dataclasses import dataclass
+from typing import Optional, Tuple
 import streamlit as st
 import pandas as pd
-from utils.data_loader import count_stunting
+from constants import STUNTING_LABELS
+from utils.aggregates import stunting_counts_from_aggregates, total_rows
+from utils.data_loader import count_stunting, duplicate_matrix
+from utils.filter_index import DataView
+from utils.result_cache import filter_key, get_result_cache
 
+PAGE_OPTIONS = ["Overview", "Analisis Visual", "Analisis Detail", "Data Explorer", "Prediksi"]
 
-def setup_sidebar_filters(df):
-    """Setup filter di sidebar dan return filtered dataframe"""
+
+@dataclass(frozen=True)
+class FilterState:
+    """Pilihan filter di sidebar; None berarti kolomnya tidak ada (tidak difilter)"""
+    sex: Optional[Tuple] = None
+    asi: Optional[Tuple] = None
+    stunting: Optional[Tuple[int, ...]] = None
+    age_range: Optional[Tuple[int, int]] = None
+
+
+def _category_options(series):
+    """Nilai unik yang valid untuk multiselect (tanpa NaN, string kosong, dan kode 0/1)"""
+    return [
+        val for val in series.unique()
+        if pd.notna(val) and str(val).strip() != ''
+        and str(val).strip() not in ['0', '1']
+    ]
+
+
+def filter_options(df):
+    """Pilihan filter dan informasi sidebar dari DataFrame penuh"""
+    return {
+        'sex': _category_options(df['Sex']) if 'Sex' in df.columns else None,
+        'asi': _category_options(df['ASI_Eksklusif']) if 'ASI_Eksklusif' in df.columns else None,
+        'stunting': 'Stunting' in df.columns,
+        'age': (int(df['Age'].min()), int(df['Age'].max())) if 'Age' in df.columns else None,
+        'sources': df['Dataset_Source'].value_counts() if 'Dataset_Source' in df.columns else None,
+        'duplicates': duplicate_matrix(df),
+    }
+
+
+def aggregate_filter_options(agg):
+    """Pilihan filter dan informasi sidebar dari agregat sel (mode streaming)"""
+    has_age = 'Age__min' in agg.columns
+    return {
+        'sex': _category_options(agg['Sex']),
+        'asi': _category_options(agg['ASI_Eksklusif']),
+        'stunting': True,
+        'age': (int(agg['Age__min'].min()), int(agg['Age__max'].max())) if has_age else None,
+        'sources': agg.groupby('Dataset_Source')['n'].sum().sort_values(ascending=False),
+        'duplicates': duplicate_matrix(agg),
+    }
+
+
+def render_sidebar_filters(options):
+    """Render navigasi dan widget filter; return (halaman, FilterState)"""
     st.sidebar.title("Navigasi Dashboard")
     st.sidebar.markdown("---")
     
     # Menu navigasi
-    page = st.sidebar.radio(
-        "Pilih Halaman",
-        ["Overview", "Analisis Visual", "Analisis Detail", "Data Explorer", "Prediksi"]
-    )
+    page = st.sidebar.radio("Pilih Halaman", PAGE_OPTIONS)
     
     # Filter di sidebar
     st.sidebar.markdown("---")
     st.sidebar.subheader("Filter Data")
     
     # Filter berdasarkan jenis kelamin
-    if 'Sex' in df.columns:
-        sex_options = [
-            val for val in df['Sex'].unique() 
-            if pd.notna(val) and str(val).strip() != '' 
-            and str(val).strip() not in ['0', '1']
-        ]
-        if sex_options:
-            sex_filter = st.sidebar.multiselect(
+    sex_filter = None
+    if options['sex'] is not None:
+        sex_filter = ()
+        if options['sex']:
+            sex_filter = tuple(st.sidebar.multiselect(
                 "Jenis Kelamin",
-                options=sex_options,
-                default=sex_options
-            )
-        else:
-            sex_filter = []
-    else:
-        sex_filter = []
+                options=options['sex'],
+                default=options['sex']
+            ))
     
     # Filter berdasarkan ASI Eksklusif
-    if 'ASI_Eksklusif' in df.columns:
-        asi_options = [
-            val for val in df['ASI_Eksklusif'].unique() 
-            if pd.notna(val) and str(val).strip() != '' 
-            and str(val).strip() not in ['0', '1']
-        ]
-        if asi_options:
-            asi_filter = st.sidebar.multiselect(
+    asi_filter = None
+    if options['asi'] is not None:
+        asi_filter = ()
+        if options['asi']:
+            asi_filter = tuple(st.sidebar.multiselect(
                 "ASI Eksklusif",
-                options=asi_options,
-                default=asi_options
-            )
-        else:
-            asi_filter = []
-    else:
-        asi_filter = []
+                options=options['asi'],
+                default=options['asi']
+            ))
     
-    # Filter berdasarkan Stunting (hanya tampilkan jika bukan numeric 0/1)
-    if 'Stunting' in df.columns:
-        # Cek apakah kolom Stunting adalah numeric dengan nilai 0/1
-        if pd.api.types.is_numeric_dtype(df['Stunting']):
-            # Jika numeric, jangan tampilkan filter (gunakan semua data)
-            stunting_filter = None  # None berarti tidak ada filter
-        else:
-            # Jika string/categorical, tampilkan filter seperti biasa (tapi filter 0/1)
-            stunting_options = [
-                val for val in df['Stunting'].unique() 
-                if pd.notna(val) and str(val).strip() != '' 
-                and str(val).strip() not in ['0', '1']
-            ]
-            if stunting_options:
-                stunting_filter = st.sidebar.multiselect(
-                    "Status Stunting",
-                    options=stunting_options,
-                    default=stunting_options
-                )
-            else:
-                stunting_filter = []
-    else:
-        stunting_filter = None
+    # Filter berdasarkan Stunting (sudah berupa kode int8 0/1 sejak load_data)
+    stunting_filter = None
+    if options['stunting']:
+        selected_labels = st.sidebar.multiselect(
+            "Status Stunting",
+            options=STUNTING_LABELS,
+            default=STUNTING_LABELS
+        )
+        stunting_filter = tuple(STUNTING_LABELS.index(label) for label in selected_labels)
     
     # Filter umur
-    if 'Age' in df.columns:
-        age_range = st.sidebar.slider(
+    age_range = None
+    if options['age'] is not None:
+        age_min, age_max = options['age']
+        age_range = tuple(st.sidebar.slider(
             "Rentang Umur (bulan)",
-            min_value=int(df['Age'].min()),
-            max_value=int(df['Age'].max()),
-            value=(int(df['Age'].min()), int(df['Age'].max()))
-        )
-    else:
-        age_range = (0, 100)
-    
-    # Terapkan filter
-    filtered_df = df.copy()
-    if 'Sex' in df.columns:
-        filtered_df = filtered_df[filtered_df['Sex'].isin(sex_filter)]
-    if 'ASI_Eksklusif' in df.columns:
-        filtered_df = filtered_df[filtered_df['ASI_Eksklusif'].isin(asi_filter)]
-    if 'Stunting' in df.columns and stunting_filter is not None:
-        # Hanya terapkan filter jika stunting_filter bukan None (bukan numeric)
-        filtered_df = filtered_df[filtered_df['Stunting'].isin(stunting_filter)]
-    if 'Age' in df.columns:
-        filtered_df = filtered_df[(filtered_df['Age'] >= age_range[0]) & (filtered_df['Age'] <= age_range[1])]
+            min_value=age_min,
+            max_value=age_max,
+            value=(age_min, age_max)
+        ))
     
-    # Informasi di sidebar
+    return page, FilterState(sex_filter, asi_filter, stunting_filter, age_range)
+
+
+def apply_filters_to_aggregates(agg, state):
+    """
+    Terapkan FilterState ke agregat sel. Filter umur tetap eksak: sel dengan umur bulat
+    dibandingkan langsung, sel dengan umur pecahan (floor, floor+1) masuk jika
+    floor >= batas bawah dan floor+1 <= batas atas (batas slider selalu bilangan bulat).
+    """
+    mask = pd.Series(True, index=agg.index)
+    if state.sex is not None:
+        mask &= agg['Sex'].isin(state.sex)
+    if state.asi is not None:
+        mask &= agg['ASI_Eksklusif'].isin(state.asi)
+    if state.stunting is not None:
+        mask &= agg['Stunting'].isin(state.stunting)
+    if state.age_range is not None:
+        age_ceil = agg['Age_Floor'] + agg['Age_Frac']
+        mask &= (agg['Age_Floor'] >= state.age_range[0]) & (age_ceil <= state.age_range[1])
+    return agg[mask]
+
+
+def render_sidebar_summary(total, stunting_count, options):
+    """Metrik data terfilter dan informasi dataset yang digabung"""
     st.sidebar.markdown("---")
-    st.sidebar.metric("Total Data", f"{len(filtered_df):,}")
-    if 'Stunting' in filtered_df.columns:
-        # Hitung jumlah stunting (handle baik numerik maupun string)
-        stunting_count = count_stunting(filtered_df['Stunting'])
+    st.sidebar.metric("Total Data", f"{total:,}")
+    if stunting_count is not None:
         st.sidebar.metric("Data Stunting", f"{stunting_count:,}")
-        if len(filtered_df) > 0:
-            st.sidebar.metric("Persentase Stunting", f"{(stunting_count/len(filtered_df)*100):.2f}%")
+        if total > 0:
+            st.sidebar.metric("Persentase Stunting", f"{(stunting_count/total*100):.2f}%")
         else:
             st.sidebar.metric("Persentase Stunting", "0.00%")
     
     # Informasi dataset yang digabung
-    if 'Dataset_Source' in df.columns:
+    if options['sources'] is not None:
         st.sidebar.markdown("---")
         st.sidebar.subheader("Dataset yang Digabung")
-        dataset_counts = df['Dataset_Source'].value_counts()
-        for source, count in dataset_counts.items():
+        for source, count in options['sources'].items():
             st.sidebar.text(f"{source}: {count:,} data")
-    
-    return page, filtered_df
+        
+        # Duplikat yang dibuang saat penggabungan (baris = sumber dipertahankan, kolom = sumber duplikat)
+        dup_matrix = options['duplicates']
+        if dup_matrix is not None:
+            st.sidebar.caption(f"Duplikat dibuang: {int(dup_matrix.to_numpy().sum()):,} baris")
+            st.sidebar.dataframe(dup_matrix, use_container_width=True)
+
+
+def setup_sidebar_filters(df, filter_index, cube=None, version=None, groups=None):
+    """
+    Setup filter di sidebar; return (halaman, DataView baris yang lolos filter).
+    DataView diambil dari ResultCache (kunci: filter + versi dataset), sehingga pindah
+    halaman tanpa mengubah filter memakai baris dan agregat yang sudah dihitung.
+    Metrik sidebar dijawab dari cube jika ada; baris hanya di-resolve jika halaman membutuhkannya.
+    """
+    cache = get_result_cache()
+    options = cache.get_or_create(('options', version), lambda: filter_options(df))
+    page, state = render_sidebar_filters(options)
+    filtered_view = cache.get_or_create(
+        filter_key(state, version),
+        lambda: DataView(
+            df,
+            lambda: filter_index.resolve(state),
+            apply_filters_to_aggregates(cube, state) if cube is not None else None,
+            groups
+        )
+    )
+    if filtered_view.cube is not None:
+        total = total_rows(filtered_view.cube)
+        stunting_count = int(stunting_counts_from_aggregates(filtered_view.cube)[1])
+    else:
+        total = len(filtered_view)
+        stunting_count = None
+        if 'Stunting' in df.columns:
+            stunting_count = filtered_view.cached('stunting_count', count_stunting, filtered_view['Stunting'])
+    render_sidebar_summary(total, stunting_count, options)
+    return page, filtered_view
+
 
+def setup_sidebar_filters_aggregates(agg):
+    """Versi mode streaming: filter diterapkan ke agregat sel, bukan ke baris"""
+    options = aggregate_filter_options(agg)
+    page, state = render_sidebar_filters(options)
+    filtered_agg = apply_filters_to_aggregates(agg, state)
+    render_sidebar_summary(total_rows(filtered_agg), int(stunting_counts_from_aggregates(filtered_agg)[1]), options)
+    return page, filtered_agg
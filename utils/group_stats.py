@@ -0,0 +1,164 @@
+"""Statistik per kelompok tervektorisasi dari kode kelompok integer (bincount/reduceat)"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+from constants import AGE_BINS, AGE_LABELS, HISTOGRAM_BINS
+
+AGE_GROUP_COLUMN = 'Kelompok_Umur'
+HISTOGRAM_COLUMNS = ['Age', 'Birth_Weight', 'Birth_Length', 'Body_Weight', 'Body_Length']
+
+
+def age_group_codes(age):
+    """Kode kelompok umur int8 seperti pd.cut(age, AGE_BINS) (interval (a, b]); -1 untuk NaN/di luar bins"""
+    codes = np.searchsorted(np.asarray(AGE_BINS, dtype=np.float64), age, side='left') - 1
+    codes[(codes < 0) | (codes >= len(AGE_LABELS))] = -1
+    return codes.astype(np.int8)
+
+
+class GroupCodes:
+    """
+    Kode kelompok per baris yang dihitung sekali saat load: kode kategori Sex dan
+    ASI_Eksklusif, kode Stunting 0/1 (-1 tanpa label), serta kode kelompok umur (Kelompok_Umur) dari Age.
+    Kode -1 berarti nilai kosong (baris tidak masuk kelompok mana pun). Tepi bin histogram
+    per kolom numerik juga dihitung sekali dari dataset penuh (edges).
+    """
+
+    def __init__(self, df):
+        self.codes = {}
+        self.labels = {}
+        for col in ['Sex', 'ASI_Eksklusif']:
+            if col in df.columns:
+                series = df[col].astype('category')
+                self.codes[col] = series.cat.codes.to_numpy()
+                self.labels[col] = list(series.cat.categories)
+        if 'Stunting' in df.columns:
+            self.codes['Stunting'] = df['Stunting'].to_numpy().astype(np.int8)
+            self.labels['Stunting'] = [0, 1]
+        if 'Age' in df.columns:
+            self.codes[AGE_GROUP_COLUMN] = age_group_codes(df['Age'].to_numpy())
+            self.labels[AGE_GROUP_COLUMN] = list(AGE_LABELS)
+        self.edges = {}
+        for col in HISTOGRAM_COLUMNS:
+            if col in df.columns:
+                values = df[col].to_numpy(dtype=np.float64)
+                values = values[~np.isnan(values)]
+                if len(values):
+                    self.edges[col] = np.histogram_bin_edges(values, bins=HISTOGRAM_BINS)
+
+
+@st.cache_resource(max_entries=1)
+def load_group_codes(_df, version=None):
+    """
+    GroupCodes untuk dataset hasil load_data(version), dibagi ke semua sesi; frame diterima
+    dari pemanggil (kunci cache = version) seperti load_filter_index
+    """
+    return GroupCodes(_df)
+
+
+def _group_ids(view, by):
+    """(id kelompok per baris valid, mask baris valid, ukuran tiap dimensi, label tiap dimensi)"""
+    codes, labels = zip(*(view.group_codes(col) for col in by))
+    valid = np.logical_and.reduce([c >= 0 for c in codes])
+    sizes = [len(label) for label in labels]
+    group_ids = np.ravel_multi_index([c[valid].astype(np.int64) for c in codes], sizes)
+    return group_ids, valid, sizes, labels
+
+
+def _group_index(present, sizes, labels, by):
+    """Index kelompok yang muncul (urut kode, seperti groupby observed=True)"""
+    positions = np.unravel_index(present, sizes)
+    arrays = [np.asarray(label, dtype=object)[pos] for label, pos in zip(labels, positions)]
+    if len(by) == 1:
+        return pd.Index(arrays[0], name=by[0])
+    return pd.MultiIndex.from_arrays(arrays, names=by)
+
+
+def group_sizes(view, by):
+    """Jumlah baris per kelompok yang muncul, seperti groupby(by, observed=True).size()"""
+    group_ids, _, sizes, labels = _group_ids(view, by)
+    size = np.bincount(group_ids, minlength=int(np.prod(sizes)))
+    present = np.flatnonzero(size)
+    return pd.Series(size[present], index=_group_index(present, sizes, labels, by))
+
+
+def grouped_stats(view, by, columns, stats=('mean', 'std', 'min', 'max')):
+    """
+    Seperti groupby(by, observed=True)[columns].agg(stats) untuk baris DataView, dalam satu
+    lintasan per kolom: count/sum/M2 dengan np.bincount dan min/max dengan reduceat atas
+    baris yang diurutkan per kelompok. std memakai ddof=1; NaN diabaikan seperti pandas.
+    Satu stat menghasilkan kolom datar (sama seperti aggregates.group_stats).
+    """
+    group_ids, valid, sizes, labels = _group_ids(view, by)
+    n_groups = int(np.prod(sizes))
+    size = np.bincount(group_ids, minlength=n_groups)
+    present = np.flatnonzero(size)
+    
+    if 'min' in stats or 'max' in stats:
+        # Urutan baris per kelompok; awal tiap kelompok yang muncul untuk reduceat.
+        # Id kecil di-cast ke int16 agar argsort stable memakai radix sort (O(n))
+        sort_ids = group_ids.astype(np.int16) if n_groups < 2 ** 15 else group_ids
+        order = np.argsort(sort_ids, kind='stable')
+        starts = np.concatenate(([0], np.cumsum(size[present])[:-1]))
+    
+    data = {}
+    for col in columns:
+        values = view[col].to_numpy(dtype=np.float64)[valid]
+        ok = ~np.isnan(values)
+        ids, x = group_ids[ok], values[ok]
+        count = np.bincount(ids, minlength=n_groups)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.bincount(ids, weights=x, minlength=n_groups) / count
+            results = {'count': count, 'mean': mean}
+            if 'std' in stats:
+                m2 = np.bincount(ids, weights=(x - mean[ids]) ** 2, minlength=n_groups)
+                results['std'] = np.where(count > 1, np.sqrt(m2 / (count - 1)), np.nan)
+        if 'min' in stats or 'max' in stats:
+            # fmin/fmax mengabaikan NaN; kelompok tanpa nilai valid tetap NaN
+            sorted_values = values[order]
+            results['min'] = np.full(n_groups, np.nan)
+            results['max'] = np.full(n_groups, np.nan)
+            if len(present):
+                results['min'][present] = np.fmin.reduceat(sorted_values, starts)
+                results['max'][present] = np.fmax.reduceat(sorted_values, starts)
+        for stat in stats:
+            data[(col, stat)] = results[stat][present]
+    
+    result = pd.DataFrame(data, index=_group_index(present, sizes, labels, by))
+    if len(stats) == 1:
+        result.columns = [col for col, _ in result.columns]
+    return result
+
+
+def stunting_rate(view, by):
+    """
+    Jumlah stunting ('sum'), jumlah baris berlabel ('count') dan Persentase stunting per
+    kelompok; baris tanpa label Stunting (kode -1) tidak dihitung
+    """
+    sizes = group_sizes(view, list(by) + ['Stunting']).unstack('Stunting', fill_value=0)
+    sizes = sizes.reindex(columns=[0, 1], fill_value=0)
+    table = pd.DataFrame({
+        'sum': sizes[1].astype(np.int64),
+        'count': (sizes[0] + sizes[1]).astype(np.int64),
+    })
+    table['Persentase'] = (table['sum'] / table['count'] * 100).round(2)
+    return table
+
+
+def histogram_counts(view, col, by='Stunting'):
+    """
+    Jumlah baris per bin `col` untuk setiap kelompok `by` dengan np.histogram. Tepi bin tetap
+    per kolom (GroupCodes.edges) sehingga sama untuk filter apa pun dan bisa dibandingkan.
+    Return (edges, {label: counts}); kelompok tanpa nilai dilewati, edges None jika kolom kosong.
+    """
+    codes, labels = view.group_codes(by)
+    edges = view.groups.edges.get(col)
+    if edges is None:
+        return None, {}
+    values = view[col].to_numpy(dtype=np.float64)
+    valid = ~np.isnan(values)
+    counts = {}
+    for code, label in enumerate(labels):
+        group_values = values[valid & (codes == code)]
+        if len(group_values):
+            counts[label] = np.histogram(group_values, bins=edges)[0]
+    return edges, counts
@@ -0,0 +1,95 @@
+"""Layanan inferensi bersama yang menggabungkan request dari banyak sesi"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+from constants import INFERENCE_BATCH_WINDOW_MS, PREDICT_BATCH_SIZE
+from utils.scoring import predict_batch
+
+
+class InferenceService:
+    """
+    Micro-batcher: request yang datang dalam jendela `window_ms` digabung menjadi
+    satu forward pass, lalu setiap pemanggil menerima baris miliknya sendiri.
+    """
+
+    def __init__(self, model, window_ms=INFERENCE_BATCH_WINDOW_MS, max_batch_size=PREDICT_BATCH_SIZE):
+        self.model = model
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'batches': 0, 'rows': 0, 'largest_batch': 0}
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name='inference-service', daemon=True)
+        self._worker.start()
+
+    def submit(self, X):
+        """Antrekan matriks fitur (n, n_features); return Future berisi hasil model"""
+        if self._closed:
+            raise RuntimeError("Layanan inferensi sudah ditutup")
+        future = Future()
+        self._queue.put((np.asarray(X, dtype=np.float32), future))
+        return future
+
+    def predict(self, X, timeout=None):
+        """Versi blocking dari submit"""
+        return self.submit(X).result(timeout)
+
+    def stats(self):
+        """Statistik antrean dan ukuran batch"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['queue_depth'] = self._queue.qsize()
+        stats['mean_batch_size'] = stats['rows'] / stats['batches'] if stats['batches'] else 0.0
+        return stats
+
+    def close(self):
+        self._closed = True
+        self._queue.put(None)
+
+    def _collect(self, first):
+        """Kumpulkan request lain yang datang dalam jendela waktu setelah request pertama"""
+        items = [first]
+        rows = len(first[0])
+        deadline = time.monotonic() + self.window
+        while rows < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            items.append(item)
+            rows += len(item[0])
+        return items
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            items = self._collect(first)
+            try:
+                X = np.concatenate([x for x, _ in items], axis=0)
+                outputs = predict_batch(self.model, X, batch_size=max(len(X), 1))
+            except Exception as e:
+                for _, future in items:
+                    future.set_exception(e)
+                continue
+
+            start = 0
+            for x, future in items:
+                future.set_result(outputs[start:start + len(x)])
+                start += len(x)
+
+            with self._lock:
+                self._stats['requests'] += len(items)
+                self._stats['batches'] += 1
+                self._stats['rows'] += len(X)
+                self._stats['largest_batch'] = max(self._stats['largest_batch'], len(X))
@@ -0,0 +1,195 @@
+"""Loader model H5 tanpa dependensi Streamlit (dipakai dashboard dan CLI)"""
+import importlib.metadata
+import importlib.util
+import json
+import os
+import pickle
+from utils.file_utils import file_sha256
+from utils.numpy_model import load_numpy_model, numpy_model_path
+
+# TensorFlow hanya dicek keberadaannya; import baru dilakukan saat metode Keras dipakai
+MODEL_AVAILABLE = importlib.util.find_spec('tensorflow') is not None
+
+
+def _tensorflow():
+    """Import TensorFlow secara lazy (mahal: beberapa detik dan ratusan MB)"""
+    import tensorflow as tf
+    return tf
+
+
+def _keras():
+    from tensorflow import keras
+    return keras
+
+
+def tensorflow_version():
+    """Versi TensorFlow terinstall tanpa meng-import-nya"""
+    try:
+        return importlib.metadata.version('tensorflow')
+    except importlib.metadata.PackageNotFoundError:
+        try:
+            return importlib.metadata.version('tensorflow-cpu')
+        except importlib.metadata.PackageNotFoundError:
+            return None
+
+
+class ModelLoadError(Exception):
+    """Semua metode loading gagal; `errors` berisi pesan per metode"""
+
+    def __init__(self, model_path, errors):
+        super().__init__(f"Gagal memuat model {model_path}")
+        self.model_path = model_path
+        self.errors = errors
+
+    def __reduce__(self):
+        # Agar bisa dikirim antar proses (process pool)
+        return (ModelLoadError, (self.model_path, self.errors))
+
+
+def _check_h5_structure(model_path):
+    """Cek struktur file HDF5 untuk menentukan apakah hanya berisi weights"""
+    try:
+        import h5py
+        with h5py.File(model_path, 'r') as f:
+            keys = list(f.keys())
+            # Model lengkap biasanya punya 'model_config' atau 'config'
+            # Weights saja biasanya hanya punya layer names atau 'model_weights'
+            # File Keras H5 menyimpan config sebagai atribut, bukan dataset
+            has_config = 'model_config' in keys or 'config' in keys or 'model_config' in f.attrs
+            has_weights = 'model_weights' in keys or any('weight' in str(k).lower() for k in keys)
+            return has_config, has_weights, keys
+    except Exception:
+        return None, None, []
+
+
+def _load_hdf5_pickle(model_path):
+    """Load dari format pickle dalam HDF5 (format yang digunakan notebook)"""
+    import h5py
+    with h5py.File(model_path, 'r') as hf:
+        if 'model' not in hf.keys():
+            return None
+        model_data = hf['model'][()]
+        # Cek apakah ini model yang di-pickle
+        if isinstance(model_data, bytes):
+            return pickle.loads(model_data)
+        # Coba convert ke bytes dan unpickle
+        return pickle.loads(model_data.tobytes())
+
+
+# (nama metode, deskripsi untuk pesan sukses, fungsi loader, butuh TensorFlow)
+LOAD_METHODS = [
+    ('NumPy', 'menggunakan mesin inferensi NumPy', load_numpy_model, False),
+    ('HDF5+pickle', 'dari format HDF5+pickle', _load_hdf5_pickle, False),
+    ('Keras default', 'menggunakan metode Keras default',
+     lambda path: _keras().models.load_model(path, compile=False), True),
+    ('safe_mode=False', 'menggunakan safe_mode=False',
+     lambda path: _keras().models.load_model(path, compile=False, safe_mode=False), True),
+    ('tf.keras', 'menggunakan tf.keras',
+     lambda path: _tensorflow().keras.models.load_model(path, compile=False), True),
+    ('tf.keras safe_mode=False', 'menggunakan tf.keras dengan safe_mode=False',
+     lambda path: _tensorflow().keras.models.load_model(path, compile=False, safe_mode=False), True),
+]
+
+
+def numpy_engine_available(model_path):
+    """Mesin NumPy bisa dicoba jika artefak .npz ada atau h5py terinstall"""
+    return os.path.exists(numpy_model_path(model_path)) or importlib.util.find_spec('h5py') is not None
+
+
+def load_plan_manifest_path(model_path):
+    """Path manifest sidecar yang mencatat metode loading yang berhasil"""
+    return model_path + '.loadplan.json'
+
+
+def _read_load_plan(model_path, source_sha256, tf_version):
+    """Metode dari manifest jika hash file dan versi TensorFlow masih cocok"""
+    try:
+        with open(load_plan_manifest_path(model_path)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('sha256') != source_sha256 or manifest.get('tensorflow') != tf_version:
+        return None
+    return manifest.get('method')
+
+
+def _write_load_plan(model_path, source_sha256, tf_version, method):
+    try:
+        with open(load_plan_manifest_path(model_path), 'w') as f:
+            json.dump({'sha256': source_sha256, 'tensorflow': tf_version, 'method': method}, f, indent=2)
+    except OSError:
+        # Direktori read-only: manifest hanya optimasi, lewati
+        pass
+
+
+def _uses_lambda_layer(model_path):
+    """Layer Lambda hanya bisa di-load dengan safe_mode=False"""
+    try:
+        import h5py
+        with h5py.File(model_path, 'r') as f:
+            config = f.attrs.get('model_config', '')
+            config = config.decode('utf-8') if isinstance(config, bytes) else str(config)
+            return '"Lambda"' in config
+    except Exception:
+        return False
+
+
+def detect_load_plan(model_path):
+    """
+    Tentukan urutan metode dari isi file H5 (sekali baca, tanpa mencoba load).
+    Metode yang paling mungkin berhasil diletakkan di depan; sisanya tetap jadi fallback.
+    """
+    has_config, has_weights, keys = _check_h5_structure(model_path)
+    if 'model' in keys:
+        # Model sklearn/objek Python yang di-pickle ke dalam HDF5
+        first = ['HDF5+pickle']
+    elif has_config:
+        first = ['NumPy', 'safe_mode=False' if _uses_lambda_layer(model_path) else 'Keras default']
+    else:
+        first = []
+    return first + [name for name, *_ in LOAD_METHODS if name not in first]
+
+
+def load_model_file(model_path):
+    """
+    Load model H5 dengan metode yang dipilih dari isi file.
+    Metode yang berhasil dicatat di manifest sidecar (kunci: hash file + versi
+    TensorFlow) sehingga start berikutnya langsung memakai jalur yang benar.
+    Return (model, deskripsi_metode); raise FileNotFoundError atau ModelLoadError.
+    """
+    if not os.path.exists(model_path):
+        if not os.path.exists(numpy_model_path(model_path)):
+            raise FileNotFoundError(model_path)
+        # Hanya artefak NumPy yang tersedia
+        plan = ['NumPy']
+        source_sha256 = tf_version = cached_method = None
+    else:
+        source_sha256 = file_sha256(model_path)
+        tf_version = tensorflow_version()
+        cached_method = _read_load_plan(model_path, source_sha256, tf_version)
+        plan = detect_load_plan(model_path)
+        if cached_method in plan:
+            plan.remove(cached_method)
+            plan.insert(0, cached_method)
+
+    methods = {name: (i, description, loader, needs_tf) for i, (name, description, loader, needs_tf) in enumerate(LOAD_METHODS, 1)}
+    errors = []
+    tf_skipped = False
+    for name in plan:
+        i, description, loader, needs_tf = methods[name]
+        if needs_tf and not MODEL_AVAILABLE:
+            if not tf_skipped:
+                errors.append("TensorFlow tidak tersedia - metode Keras dilewati")
+                tf_skipped = True
+            continue
+        try:
+            model = loader(model_path)
+        except Exception as e:
+            errors.append(f"Metode {i} ({name}): {str(e)}")
+            continue
+        if model is not None:
+            if source_sha256 is not None and name != cached_method:
+                _write_load_plan(model_path, source_sha256, tf_version, name)
+            return model, description
+
+    raise ModelLoadError(model_path, errors)
@@ -0,0 +1,236 @@
+"""Mesin inferensi NumPy untuk model Keras Sequential berbasis Dense"""
+import json
+import os
+import numpy as np
+from utils.file_utils import file_sha256
+
+# Layer yang tidak mengubah nilai saat inferensi
+IDENTITY_LAYERS = {
+    'InputLayer', 'Dropout', 'AlphaDropout', 'GaussianDropout', 'GaussianNoise',
+    'SpatialDropout1D', 'ActivityRegularization',
+}
+
+
+class UnsupportedModelError(Exception):
+    """Arsitektur model tidak bisa dijalankan dengan mesin NumPy"""
+
+
+def numpy_model_path(model_path):
+    """Path artefak .npz untuk sebuah file model H5"""
+    return os.path.splitext(model_path)[0] + '.npz'
+
+
+def _sigmoid(x):
+    with np.errstate(over='ignore'):
+        return 1.0 / (1.0 + np.exp(-x))
+
+
+def _softmax(x):
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+def _elu(x):
+    return np.where(x > 0, x, np.expm1(np.minimum(x, 0)))
+
+
+def _selu(x):
+    return 1.0507009873554805 * np.where(x > 0, x, 1.6732632423543772 * np.expm1(np.minimum(x, 0)))
+
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0),
+    'sigmoid': _sigmoid,
+    'softmax': _softmax,
+    'tanh': np.tanh,
+    'elu': _elu,
+    'selu': _selu,
+    'softplus': lambda x: np.logaddexp(0, x),
+    'softsign': lambda x: x / (1 + np.abs(x)),
+    'swish': lambda x: x * _sigmoid(x),
+    'silu': lambda x: x * _sigmoid(x),
+    'exponential': np.exp,
+}
+
+
+def _activation_name(activation):
+    """Nama aktivasi dari config Keras 2 (string) maupun Keras 3 (dict)"""
+    if activation is None:
+        return 'linear'
+    if isinstance(activation, dict):
+        activation = activation.get('config', activation.get('class_name'))
+        if isinstance(activation, dict):
+            activation = activation.get('name')
+    if activation not in ACTIVATIONS:
+        raise UnsupportedModelError(f"Aktivasi '{activation}' tidak didukung")
+    return activation
+
+
+def _decode(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def _layer_weights(weights_group, layer_name):
+    """Baca bobot satu layer sesuai urutan atribut weight_names"""
+    if layer_name not in weights_group:
+        return []
+    group = weights_group[layer_name]
+    names = [_decode(n) for n in group.attrs.get('weight_names', [])]
+    return [np.asarray(group[name], dtype=np.float32) for name in names]
+
+
+def read_keras_h5(model_path):
+    """
+    Baca arsitektur dan bobot model Keras (format H5) tanpa TensorFlow.
+    Return list operasi [(jenis, parameter)] siap dijalankan oleh NumpyModel.
+    """
+    import h5py
+    with h5py.File(model_path, 'r') as f:
+        if 'model_config' not in f.attrs:
+            raise UnsupportedModelError("File H5 tidak memiliki model_config")
+        config = json.loads(_decode(f.attrs['model_config']))
+        if config.get('class_name') != 'Sequential':
+            raise UnsupportedModelError(f"Model {config.get('class_name')} tidak didukung (hanya Sequential)")
+        weights_group = f['model_weights'] if 'model_weights' in f else f
+        layers = config['config']['layers'] if isinstance(config['config'], dict) else config['config']
+
+        ops = []
+        for layer in layers:
+            class_name = layer['class_name']
+            layer_config = layer['config']
+            name = layer_config.get('name')
+            if class_name in IDENTITY_LAYERS:
+                continue
+            weights = _layer_weights(weights_group, name)
+            if class_name == 'Dense':
+                kernel = weights[0]
+                bias = weights[1] if layer_config.get('use_bias', True) else np.zeros(kernel.shape[1], dtype=np.float32)
+                ops.append(('dense', {'kernel': kernel, 'bias': bias}))
+                activation = _activation_name(layer_config.get('activation'))
+                if activation != 'linear':
+                    ops.append(('activation', {'name': activation}))
+            elif class_name == 'BatchNormalization':
+                weights = list(weights)
+                gamma = weights.pop(0) if layer_config.get('scale', True) else None
+                beta = weights.pop(0) if layer_config.get('center', True) else None
+                moving_mean, moving_variance = weights
+                # Lipat BatchNorm menjadi transformasi affine x * a + c
+                a = 1.0 / np.sqrt(moving_variance + layer_config.get('epsilon', 1e-3))
+                if gamma is not None:
+                    a = a * gamma
+                c = -moving_mean * a
+                if beta is not None:
+                    c = c + beta
+                ops.append(('affine', {'scale': a.astype(np.float32), 'shift': c.astype(np.float32)}))
+            elif class_name == 'Activation':
+                ops.append(('activation', {'name': _activation_name(layer_config.get('activation'))}))
+            elif class_name == 'ReLU' and not layer_config.get('max_value') and not layer_config.get('negative_slope') and not layer_config.get('threshold'):
+                ops.append(('activation', {'name': 'relu'}))
+            elif class_name == 'LeakyReLU':
+                slope = layer_config.get('negative_slope', layer_config.get('alpha', 0.3))
+                ops.append(('leaky_relu', {'slope': float(slope)}))
+            elif class_name == 'Flatten':
+                ops.append(('flatten', {}))
+            else:
+                raise UnsupportedModelError(f"Layer {class_name} tidak didukung")
+
+    if not any(kind == 'dense' for kind, _ in ops):
+        raise UnsupportedModelError("Model tidak memiliki layer Dense")
+    return ops
+
+
+class NumpyModel:
+    """Forward pass NumPy murni dengan antarmuka mirip model Keras"""
+
+    def __init__(self, ops, source_sha256=None):
+        self.ops = ops
+        self.source_sha256 = source_sha256
+        dense = [params for kind, params in ops if kind == 'dense']
+        self.input_shape = (None, dense[0]['kernel'].shape[0])
+        self.output_shape = (None, dense[-1]['kernel'].shape[1])
+
+    @property
+    def layers(self):
+        return [kind for kind, _ in self.ops]
+
+    def count_params(self):
+        return int(sum(p.size for _, params in self.ops for p in params.values() if isinstance(p, np.ndarray)))
+
+    def predict(self, X, verbose=0, batch_size=None):
+        x = np.asarray(X, dtype=np.float32)
+        for kind, params in self.ops:
+            if kind == 'dense':
+                x = x @ params['kernel'] + params['bias']
+            elif kind == 'activation':
+                x = ACTIVATIONS[params['name']](x)
+            elif kind == 'affine':
+                x = x * params['scale'] + params['shift']
+            elif kind == 'leaky_relu':
+                x = np.where(x > 0, x, x * params['slope'])
+            elif kind == 'flatten':
+                x = x.reshape(len(x), -1)
+        return x.astype(np.float32, copy=False)
+
+    def save(self, path):
+        """Simpan ke artefak .npz (spesifikasi layer dalam JSON + array bobot)"""
+        arrays = {}
+        spec = []
+        for i, (kind, params) in enumerate(self.ops):
+            entry = {'op': kind}
+            for key, value in params.items():
+                if isinstance(value, np.ndarray):
+                    arrays[f'{i}_{key}'] = value
+                    entry[key] = f'{i}_{key}'
+                else:
+                    entry[key] = value
+            spec.append(entry)
+        np.savez(path, spec=np.array(json.dumps(spec)), source_sha256=np.array(self.source_sha256 or ''), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            spec = json.loads(str(data['spec']))
+            ops = []
+            for entry in spec:
+                kind = entry.pop('op')
+                params = {
+                    key: data[value] if key in ('kernel', 'bias', 'scale', 'shift') else value
+                    for key, value in entry.items()
+                }
+                ops.append((kind, params))
+            return cls(ops, str(data['source_sha256']) or None)
+
+
+def export_numpy_model(model_path, output_path=None):
+    """Ekspor model H5 ke artefak .npz; raise UnsupportedModelError jika tidak didukung"""
+    model = NumpyModel(read_keras_h5(model_path), file_sha256(model_path))
+    model.save(output_path or numpy_model_path(model_path))
+    return model
+
+
+def load_numpy_model(model_path):
+    """
+    Load mesin NumPy untuk model H5.
+    Artefak .npz dipakai jika hash sumbernya cocok; jika belum ada atau usang,
+    model diekspor ulang. Raise UnsupportedModelError jika arsitektur tidak didukung.
+    """
+    artifact = numpy_model_path(model_path)
+    if not os.path.exists(model_path):
+        if os.path.exists(artifact):
+            return NumpyModel.load(artifact)
+        raise FileNotFoundError(model_path)
+
+    source_sha256 = file_sha256(model_path)
+    if os.path.exists(artifact):
+        model = NumpyModel.load(artifact)
+        if model.source_sha256 == source_sha256:
+            return model
+
+    model = NumpyModel(read_keras_h5(model_path), source_sha256)
+    try:
+        model.save(artifact)
+    except OSError:
+        # Direktori read-only: tetap pakai model di memori
+        pass
+    return model
@@ -0,0 +1,79 @@
+"""Cache LRU + TTL untuk hasil prediksi dengan input yang sama"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from constants import PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL, PREDICTION_INPUT_STEPS
+
+
+class PredictionCache:
+    """Cache LRU dengan batas ukuran dan masa berlaku (detik) per entri"""
+
+    def __init__(self, maxsize=PREDICTION_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return nilai cache, atau None jika tidak ada / sudah kedaluwarsa"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries), 'maxsize': self.maxsize}
+
+
+def file_fingerprint(*paths):
+    """Sidik jari murah (ukuran + mtime) file model/artefak NumPy/scaler; berubah saat file diganti"""
+    fingerprint = []
+    for path in paths:
+        if path and os.path.exists(path):
+            stat = os.stat(path)
+            fingerprint.append((os.path.basename(path), stat.st_size, stat.st_mtime_ns))
+    return tuple(fingerprint)
+
+
+def quantize_inputs(age, birth_weight, birth_length, body_weight, body_length):
+    """
+    Input numerik dibulatkan ke kelipatan step widget (PREDICTION_INPUT_STEPS). Nilai ini
+    dipakai untuk kunci cache sekaligus untuk prediksi, sehingga hasil cache dan hasil
+    hitung ulang untuk input yang sama selalu identik.
+    """
+    values = {
+        'Age': age,
+        'Birth_Weight': birth_weight,
+        'Birth_Length': birth_length,
+        'Body_Weight': body_weight,
+        'Body_Length': body_length,
+    }
+    # round() kedua membuang sisa floating point (mis. 32 * 0.1 = 3.2000000000000003)
+    return tuple(
+        round(int(round(float(value) / PREDICTION_INPUT_STEPS[name])) * PREDICTION_INPUT_STEPS[name], 6)
+        for name, value in values.items()
+    )
+
+
+def prediction_key(sex, age, birth_weight, birth_length, body_weight, body_length, asi, fingerprint=()):
+    """Kunci cache dari input hasil quantize_inputs + sidik jari model/scaler"""
+    quantized = quantize_inputs(age, birth_weight, birth_length, body_weight, body_length)
+    return (sex, asi) + quantized + (fingerprint,)
@@ -0,0 +1,141 @@
+"""Sketsa kuantil KLL yang bisa digabung (untuk box plot dan kuartil dari agregat sel)"""
+import numpy as np
+from constants import BOX_MAX_OUTLIERS, SKETCH_K
+
+# Rasio kapasitas antar level KLL (level lebih rendah menyimpan item lebih sedikit)
+CAPACITY_RATIO = 2 / 3
+
+
+class QuantileSketch:
+    """
+    Sketsa KLL: levels[h] berisi item berbobot 2**h. Level yang melebihi kapasitas
+    dipadatkan (diurutkan, lalu setiap item kedua naik ke level berikutnya), sehingga ukuran
+    sketsa hanya bergantung pada k, bukan jumlah baris. Selama belum ada pemadatan, sketsa
+    menyimpan semua nilai dan kuantilnya eksak. Offset pemadatan bergantian (bukan acak)
+    agar hasil sama untuk data yang sama.
+    """
+
+    def __init__(self, k=SKETCH_K):
+        self.k = k
+        self.levels = []
+        self.count = 0
+        self._compactions = 0
+
+    @classmethod
+    def from_values(cls, values, k=SKETCH_K):
+        return cls(k).update(values)
+
+    @classmethod
+    def merge_all(cls, sketches, k=SKETCH_K):
+        """Gabungan banyak sketsa sekaligus: level yang sama disambung lalu dipadatkan sekali"""
+        sketches = [s for s in sketches if s is not None and s.count]
+        result = cls(k)
+        if not sketches:
+            return result
+        depth = max(len(s.levels) for s in sketches)
+        result.levels = [
+            np.concatenate([s.levels[h] for s in sketches if h < len(s.levels)]) for h in range(depth)
+        ]
+        result.count = sum(s.count for s in sketches)
+        result._compactions = sum(s._compactions for s in sketches)
+        result._compress()
+        return result
+
+    def update(self, values):
+        """Tambahkan nilai (NaN diabaikan); return self"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        self.count += len(values)
+        if self.levels:
+            self.levels[0] = np.concatenate([self.levels[0], values])
+        else:
+            self.levels.append(values.copy())
+        self._compress()
+        return self
+
+    def merge(self, other):
+        return QuantileSketch.merge_all([self, other], self.k)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * CAPACITY_RATIO ** depth)), 2)
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # Jumlah item genap dipadatkan; sisa satu item (terbesar) tetap di level ini
+                even = len(items) - len(items) % 2
+                offset = self._compactions % 2
+                self._compactions += 1
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], items[offset:even:2]])
+                self.levels[level] = items[even:]
+            level += 1
+
+    def items(self):
+        """(nilai terurut, bobot) semua item sketsa"""
+        if not self.levels:
+            return np.empty(0), np.empty(0)
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** h) for h, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        return values[order], weights[order]
+
+    def quantiles(self, qs):
+        """
+        Kuantil dengan interpolasi linear antara rank floor dan ceil (sama dengan np.quantile
+        default saat sketsa masih eksak); item berbobot w menempati w rank berurutan dengan
+        nilai yang sama. NaN jika sketsa kosong.
+        """
+        qs = np.asarray(qs, dtype=np.float64)
+        if not self.count:
+            return np.full(qs.shape, np.nan)
+        values, weights = self.items()
+        # Total bobot = count; rank r (0-based) milik item pertama dengan cumsum > r
+        cumulative = np.cumsum(weights)
+        position = qs * (self.count - 1)
+        lower, upper = np.floor(position), np.ceil(position)
+        
+        def at(rank):
+            return values[np.minimum(np.searchsorted(cumulative, rank, side='right'), len(values) - 1)]
+        
+        return at(lower) + (position - lower) * (at(upper) - at(lower))
+
+    def nbytes(self):
+        return sum(items.nbytes for items in self.levels)
+
+
+def box_summary(sketch, minimum=None, maximum=None, max_outliers=BOX_MAX_OUTLIERS):
+    """
+    Ringkasan box plot dari sketsa: q1, median, q3, whisker (nilai terjauh di dalam
+    1.5 IQR, seperti Plotly) dan maksimal `max_outliers` outlier. min/max eksak (jika
+    diberikan) ikut dipakai agar nilai ekstrem selalu tampil. None jika sketsa kosong.
+    """
+    if not sketch.count:
+        return None
+    q1, median, q3 = sketch.quantiles([0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    low_fence, high_fence = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+    values, _ = sketch.items()
+    extremes = np.array([v for v in (minimum, maximum) if v is not None and not np.isnan(v)])
+    values = np.unique(np.concatenate([values, extremes]))
+    inside = values[(values >= low_fence) & (values <= high_fence)]
+    outliers = values[(values < low_fence) | (values > high_fence)]
+    if len(outliers) > max_outliers:
+        # Sampel merata atas outlier terurut; yang paling ekstrem selalu ikut
+        outliers = outliers[np.unique(np.linspace(0, len(outliers) - 1, max_outliers).round().astype(int))]
+    return {
+        'count': sketch.count,
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'lowerfence': inside.min() if len(inside) else q1,
+        'upperfence': inside.max() if len(inside) else q3,
+        'outliers': outliers,
+    }
@@ -0,0 +1,98 @@
+"""Cache LRU hasil filter (DataView + agregat turunannya) bersama antar halaman dan sesi"""
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import streamlit as st
+from constants import FILTER_CACHE_MAX_MB, FILTER_CACHE_SIZE
+
+
+def filter_key(state, version):
+    """Hash kanonik FilterState + versi dataset (urutan pilihan multiselect tidak berpengaruh)"""
+    def canonical(values):
+        return None if values is None else sorted({str(value) for value in values})
+    payload = json.dumps({
+        'version': version,
+        'sex': canonical(state.sex),
+        'asi': canonical(state.asi),
+        'stunting': canonical(state.stunting),
+        'age_range': list(state.age_range) if state.age_range is not None else None,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def estimate_nbytes(value):
+    """Perkiraan memori hasil yang di-cache (DataFrame, Series, array, bytes, dict/list)"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(estimate_nbytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_nbytes(item) for item in value)
+    if callable(getattr(value, 'nbytes', None)):
+        return value.nbytes()
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """
+    Cache LRU dengan batas jumlah entri dan total memori. Ukuran entri dihitung ulang
+    saat trim karena DataView terus menyimpan agregat baru selama halaman dirender.
+    """
+
+    def __init__(self, maxsize=FILTER_CACHE_SIZE, max_bytes=FILTER_CACHE_MAX_MB * 1024 * 1024):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_create(self, key, factory):
+        """Return nilai untuk key; jika belum ada, buat dengan factory() lalu simpan"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = factory()
+        with self._lock:
+            value = self._entries.setdefault(key, value)
+            self._entries.move_to_end(key)
+            self._trim()
+        return value
+
+    def _trim(self):
+        """Buang entri paling lama tidak dipakai; entri terbaru selalu dipertahankan"""
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        sizes = [estimate_nbytes(value) for value in self._entries.values()]
+        total = sum(sizes)
+        while total > self.max_bytes and len(self._entries) > 1:
+            self._entries.popitem(last=False)
+            total -= sizes.pop(0)
+
+    def nbytes(self):
+        with self._lock:
+            return sum(estimate_nbytes(value) for value in self._entries.values())
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries), 'maxsize': self.maxsize}
+
+
+@st.cache_resource
+def get_result_cache():
+    """Cache hasil filter bersama untuk semua sesi"""
+    return ResultCache()
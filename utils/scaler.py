@@ -0,0 +1,94 @@
+"""Scaler fitur berbasis NumPy (tanpa sklearn) untuk jalur prediksi"""
+import json
+import os
+import threading
+import numpy as np
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Urutan pencarian file scaler: format portable dulu, pickle lama sebagai fallback
+SCALER_FILES = ['feature_scaler.npz', 'feature_scaler.json', 'feature_scaler.pkl']
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+class FeatureScaler:
+    """Transformasi affine (x - mean) / scale, setara StandardScaler.transform"""
+
+    def __init__(self, mean, scale, feature_names=None):
+        self.mean = np.ascontiguousarray(mean, dtype=np.float32)
+        self.scale = np.ascontiguousarray(scale, dtype=np.float32)
+        self.feature_names = list(feature_names) if feature_names is not None else None
+
+    @property
+    def n_features(self):
+        return self.mean.shape[0]
+
+    def transform(self, X, copy=False):
+        """
+        Terapkan scaling pada matriks (n, n_features).
+        Jika X sudah float32 C-contiguous dan copy=False, X diubah in place.
+        """
+        if copy or not (isinstance(X, np.ndarray) and X.dtype == np.float32 and X.flags['C_CONTIGUOUS'] and X.flags['WRITEABLE']):
+            X = np.array(X, dtype=np.float32, order='C')
+        np.subtract(X, self.mean, out=X)
+        np.divide(X, self.scale, out=X)
+        return X
+
+    def save(self, path):
+        """Simpan ke format portable (.npz atau .json)"""
+        names = self.feature_names or []
+        if path.endswith('.json'):
+            with open(path, 'w') as f:
+                json.dump({
+                    'mean': self.mean.tolist(),
+                    'scale': self.scale.tolist(),
+                    'feature_names': names
+                }, f)
+        else:
+            np.savez(path, mean=self.mean, scale=self.scale, feature_names=np.array(names, dtype=str))
+
+    @classmethod
+    def from_file(cls, path):
+        """Load scaler dari .npz, .json, atau .pkl (format lama create_scaler.py)"""
+        if path.endswith('.npz'):
+            with np.load(path, allow_pickle=False) as data:
+                names = data['feature_names'].tolist() if 'feature_names' in data.files else None
+                return cls(data['mean'], data['scale'], names or None)
+        if path.endswith('.json'):
+            with open(path) as f:
+                data = json.load(f)
+            return cls(data['mean'], data['scale'], data.get('feature_names') or None)
+        # Fallback pickle: butuh sklearn karena objek StandardScaler ikut tersimpan
+        import pickle
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        return cls(data['mean'], data['scale'], data.get('feature_names'))
+
+
+def find_scaler_path(directory=PROJECT_DIR):
+    """Cari file scaler pertama yang tersedia sesuai urutan SCALER_FILES"""
+    for name in SCALER_FILES:
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def get_feature_scaler(path=None):
+    """
+    Ambil scaler bersama (satu per proses).
+    Scaler dimuat ulang hanya jika mtime file berubah; return None jika tidak ada file.
+    """
+    path = path or find_scaler_path()
+    if path is None:
+        return None
+    mtime = os.path.getmtime(path)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        scaler = FeatureScaler.from_file(path)
+        _cache[path] = (mtime, scaler)
+        return scaler
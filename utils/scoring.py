@@ -0,0 +1,113 @@
+"""Scoring batch untuk banyak data sekaligus (tanpa dependensi Streamlit)"""
+import numpy as np
+import pandas as pd
+from constants import SCORING_CHUNK_SIZE, PREDICT_BATCH_SIZE
+from utils.features import RAW_COLUMNS, compute_feature_matrix
+from utils.scaler import get_feature_scaler
+
+NUMERIC_RAW_COLUMNS = ['Age', 'Birth_Weight', 'Birth_Length', 'Body_Weight', 'Body_Length']
+
+RESULT_COLUMNS = ['Prob_Tidak_Stunting', 'Prob_Stunting', 'Prediksi']
+
+
+def missing_columns(columns):
+    """Kolom input wajib (skema dataset_stunting_balanced.csv) yang tidak ada"""
+    return [c for c in RAW_COLUMNS if c not in columns]
+
+
+def prepare_features(df):
+    """
+    Hitung dan scale fitur untuk setiap baris DataFrame.
+    Return (X, valid) dengan X hanya berisi baris valid (semua kolom numerik terisi).
+    """
+    numeric = {col: pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64) for col in NUMERIC_RAW_COLUMNS}
+    valid = np.ones(len(df), dtype=bool)
+    for values in numeric.values():
+        valid &= ~np.isnan(values)
+    X = compute_feature_matrix(
+        df['Sex'].to_numpy()[valid],
+        numeric['Age'][valid],
+        numeric['Birth_Weight'][valid],
+        numeric['Birth_Length'][valid],
+        numeric['Body_Weight'][valid],
+        numeric['Body_Length'][valid],
+        df['ASI_Eksklusif'].to_numpy()[valid],
+    )
+    scaler = get_feature_scaler()
+    if scaler is not None:
+        scaler.transform(X)
+    return X, valid
+
+
+def predict_batch(model, X, batch_size=PREDICT_BATCH_SIZE):
+    """Jalankan model per batch berukuran tetap dan gabungkan hasilnya"""
+    outputs = []
+    for start in range(0, len(X), batch_size):
+        batch = X[start:start + batch_size]
+        # Cek apakah model adalah sklearn atau keras
+        if hasattr(model, 'predict_proba'):
+            outputs.append(np.asarray(model.predict_proba(batch)))
+        else:
+            outputs.append(np.asarray(model.predict(batch, verbose=0)))
+    if not outputs:
+        return np.empty((0, 1), dtype=np.float32)
+    return np.concatenate(outputs, axis=0)
+
+
+def interpret_batch(prediction):
+    """
+    Versi vektor dari interpret_prediction.
+    Return (prob_no_stunting, prob_stunting, labels) sebagai array per baris.
+    """
+    prediction = np.asarray(prediction, dtype=np.float64)
+    if prediction.ndim == 1:
+        prediction = prediction[:, None]
+    if prediction.shape[1] == 1:
+        prob_stunting = np.clip(prediction[:, 0], 0.0, 1.0)
+        prob_no_stunting = 1.0 - prob_stunting
+    else:
+        prob_no_stunting = prediction[:, 0].copy()
+        prob_stunting = prediction[:, 1].copy()
+        total = prob_no_stunting + prob_stunting
+        positive = total > 0
+        prob_no_stunting[positive] /= total[positive]
+        prob_stunting[positive] /= total[positive]
+    
+    threshold = 0.5
+    labels = np.where(prob_stunting > threshold, "Stunting", "Tidak Stunting").astype(object)
+    return prob_no_stunting, prob_stunting, labels
+
+
+def score_frame(df, model, batch_size=PREDICT_BATCH_SIZE):
+    """Tambahkan kolom probabilitas dan label prediksi ke salinan DataFrame"""
+    X, valid = prepare_features(df)
+    prob_no_stunting, prob_stunting, labels = interpret_batch(predict_batch(model, X, batch_size))
+    
+    result = df.copy()
+    result['Prob_Tidak_Stunting'] = np.nan
+    result['Prob_Stunting'] = np.nan
+    # Tipe kolom tetap teks walau tidak ada baris valid (schema output sama untuk setiap chunk)
+    result['Prediksi'] = pd.Series(None, index=df.index, dtype='str')
+    result.loc[valid, 'Prob_Tidak_Stunting'] = prob_no_stunting
+    result.loc[valid, 'Prob_Stunting'] = prob_stunting
+    result.loc[valid, 'Prediksi'] = labels
+    return result
+
+
+def iter_csv_chunks(source, chunksize=SCORING_CHUNK_SIZE):
+    """
+    Baca CSV per chunk sehingga memori tetap terbatas. Semua kolom dibaca sebagai teks dan
+    kolom numerik input dikonversi ke float64 (teks tidak valid -> NaN), sehingga tipe kolom
+    tidak bergantung pada isi chunk (chunk integer semua vs. chunk dengan nilai kosong/teks).
+    """
+    for chunk in pd.read_csv(source, chunksize=chunksize, dtype=str):
+        for col in NUMERIC_RAW_COLUMNS:
+            if col in chunk.columns:
+                chunk[col] = pd.to_numeric(chunk[col], errors='coerce').astype(np.float64)
+        yield chunk
+
+
+def iter_scored_chunks(source, model, chunksize=SCORING_CHUNK_SIZE, batch_size=PREDICT_BATCH_SIZE):
+    """Scoring CSV per chunk, menghasilkan DataFrame hasil untuk setiap chunk"""
+    for chunk in iter_csv_chunks(source, chunksize):
+        yield score_frame(chunk, model, batch_size)
@@ -0,0 +1,67 @@
+"""DataFrame read-only yang dibagi ke semua sesi dalam satu proses (st.cache_resource)"""
+import numpy as np
+import pandas as pd
+
+READ_ONLY_MESSAGE = (
+    "Dataset bersama bersifat read-only; gunakan .assign() atau .copy() "
+    "untuk menambah atau mengubah kolom"
+)
+
+
+class ReadOnlyDataFrame(pd.DataFrame):
+    """
+    DataFrame yang kolomnya tidak bisa ditambah, diganti atau dihapus. Hasil operasi
+    turunan (filter, groupby, assign, copy, join) berupa DataFrame biasa milik pemanggil.
+    """
+
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(READ_ONLY_MESSAGE)
+    
+    __setitem__ = _read_only
+    __delitem__ = _read_only
+    insert = _read_only
+    pop = _read_only
+    # Semua operasi inplace=True (dropna, sort_values, drop, query, fillna, ...) berakhir di
+    # _update_inplace; _set_item dipakai penulisan kolom lewat .loc
+    _update_inplace = _read_only
+    _set_item = _read_only
+
+    def __setattr__(self, name, value):
+        # _mgr hanya diganti oleh operasi inplace (konstruktor memakai object.__setattr__)
+        if name in ('columns', 'index', '_mgr'):
+            self._read_only()
+        super().__setattr__(name, value)
+
+
+def _read_only_values(series):
+    """Salinan nilai kolom dengan array NumPy yang tidak bisa ditulis (writeable=False)"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy().copy()
+        codes.flags.writeable = False
+        return pd.Categorical.from_codes(codes, dtype=series.dtype)
+    if isinstance(series.dtype, np.dtype):
+        values = series.to_numpy().copy()
+        values.flags.writeable = False
+        return values
+    # Extension array lain (mis. string Arrow) memang immutable
+    return series.array
+
+
+def freeze_frame(df):
+    """
+    Salin df sekali menjadi ReadOnlyDataFrame dengan array read-only, sehingga
+    penulisan nilai lewat .loc/.iloc/.to_numpy() ke data bersama juga gagal.
+    """
+    columns = {col: _read_only_values(df[col]) for col in df.columns}
+    frozen = ReadOnlyDataFrame(columns, index=df.index, copy=False)
+    frozen.attrs.update(df.attrs)
+    return frozen
+
+
+def read_only_view(df):
+    """Bungkus hasil filter sebagai ReadOnlyDataFrame tanpa menyalin data"""
+    return df if isinstance(df, ReadOnlyDataFrame) else ReadOnlyDataFrame(df)
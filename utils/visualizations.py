@@ -1,10 +1,11 @@
-"""Fungsi untuk membuat visualisasi"""
-import plotly.express as px
+"""Fungsi untuk membuat visualisasi (plotly di-import lazy di setiap helper)"""
+import numpy as np
 from constants import COLORS
 
 
 def create_bar_chart(df, x, y, color, title, height=400):
     """Helper untuk membuat bar chart"""
+    import plotly.express as px
     fig = px.bar(
         df,
         x=x,
@@ -24,6 +25,7 @@ def create_bar_chart(df, x, y, color, title, height=400):
 
 def create_pie_chart(values, names, title, height=400):
     """Helper untuk membuat pie chart"""
+    import plotly.express as px
     fig = px.pie(
         values=values,
         names=names,
@@ -36,23 +38,33 @@ def create_pie_chart(values, names, title, height=400):
     return fig
 
 
-def create_histogram(df, x, color_col, title, height=500):
-    """Helper untuk membuat histogram"""
-    fig = px.histogram(
-        df,
-        x=x,
-        color=color_col,
-        nbins=30,
-        barmode='overlay',
-        opacity=0.7,
-        color_discrete_map={0: COLORS['no_stunting'], 1: COLORS['stunting']}
-    )
-    fig.update_layout(title=title, height=height)
+def create_histogram(edges, counts, x, title, height=500):
+    """
+    Helper untuk membuat histogram dari jumlah per bin yang sudah dihitung di server
+    ({label: counts} dengan tepi bin `edges`), sebagai bar overlay per label
+    """
+    import plotly.graph_objects as go
+    color_map = {'Tidak Stunting': COLORS['no_stunting'], 'Stunting': COLORS['stunting']}
+    fig = go.Figure()
+    if edges is not None:
+        centers = (edges[:-1] + edges[1:]) / 2
+        widths = np.diff(edges)
+        for label, values in counts.items():
+            fig.add_trace(go.Bar(
+                x=centers,
+                y=values,
+                width=widths,
+                name=label,
+                marker_color=color_map.get(label),
+                opacity=0.7
+            ))
+    fig.update_layout(title=title, height=height, barmode='overlay', bargap=0, xaxis_title=x, yaxis_title='count')
     return fig
 
 
 def create_scatter(df, x, y, color_col, size_col, title, height=600):
     """Helper untuk membuat scatter plot"""
+    import plotly.express as px
     fig = px.scatter(
         df,
         x=x,
@@ -60,7 +72,7 @@ def create_scatter(df, x, y, color_col, size_col, title, height=600):
         color=color_col,
         size=size_col,
         hover_data=['Sex', 'ASI_Eksklusif'] if 'Sex' in df.columns else [],
-        color_discrete_map={0: COLORS['no_stunting'], 1: COLORS['stunting']}
+        color_discrete_map={'Tidak Stunting': COLORS['no_stunting'], 'Stunting': COLORS['stunting']}
     )
     fig.update_layout(title=title, height=height)
     return fig
@@ -68,13 +80,49 @@ def create_scatter(df, x, y, color_col, size_col, title, height=600):
 
 def create_box_plot(df, x, y, color_col, title, height=400):
     """Helper untuk membuat box plot"""
+    import plotly.express as px
     fig = px.box(
         df,
         x=x,
         y=y,
         color=color_col,
-        color_discrete_map={0: COLORS['no_stunting'], 1: COLORS['stunting']}
+        color_discrete_map={'Tidak Stunting': COLORS['no_stunting'], 'Stunting': COLORS['stunting']}
     )
     fig.update_layout(title=title, height=height)
     return fig
 
+
+def create_box_plot_from_summaries(summaries, x, y, title, height=400):
+    """
+    Box plot dari ringkasan per kelompok ({label: box_summary}) tanpa data mentah:
+    kotak dan whisker dari kuartil yang sudah dihitung, outlier (dibatasi) sebagai titik
+    """
+    import plotly.graph_objects as go
+    color_map = {'Tidak Stunting': COLORS['no_stunting'], 'Stunting': COLORS['stunting']}
+    fig = go.Figure()
+    for label, summary in summaries.items():
+        color = color_map.get(label)
+        fig.add_trace(go.Box(
+            x=[label],
+            q1=[summary['q1']],
+            median=[summary['median']],
+            q3=[summary['q3']],
+            lowerfence=[summary['lowerfence']],
+            upperfence=[summary['upperfence']],
+            name=label,
+            legendgroup=label,
+            marker_color=color,
+            boxpoints=False
+        ))
+        if len(summary['outliers']):
+            fig.add_trace(go.Scatter(
+                x=[label] * len(summary['outliers']),
+                y=summary['outliers'],
+                mode='markers',
+                name=label,
+                legendgroup=label,
+                showlegend=False,
+                marker=dict(color=color, size=4)
+            ))
+    fig.update_layout(title=title, height=height, xaxis_title=x, yaxis_title=y, legend_title_text=x)
+    return fig